@@ -9,11 +9,14 @@ This DAG orchestrates the complete data pipeline for the Dungeon Master's Oracle
 5. Builds and persists FAISS vector index
 """
 
+import os
 from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.providers.google.cloud.transfers.local_to_gcs import LocalFilesystemToGCSOperator
 from airflow.models import Variable
+from google.api_core import retry
+from google.cloud import bigquery
 
 # DAG Configuration
 default_args = {
@@ -32,6 +35,67 @@ PROJECT_ID = Variable.get("GCP_PROJECT_ID", default_var="your-project-id")
 DATA_BUCKET = Variable.get("DATA_BUCKET", default_var="your-data-bucket")
 DATASET_ID = Variable.get("BIGQUERY_DATASET_ID", default_var="dnd_data")
 TABLE_ID = Variable.get("BIGQUERY_TABLE_ID", default_var="monsters")
+MONSTER_SOURCE_CSV = Variable.get("MONSTER_SOURCE_CSV", default_var="/tmp/raw_monsters.csv")
+DEBUG = Variable.get("DEBUG", default_var="false").lower() == "true"
+
+# On-disk HTTP cache for scraped SRD pages
+SRD_HTTP_CACHE = "/tmp/srd_cache"
+HTTP_CACHE_EXPIRE_SECONDS = 86400
+
+# Maximum number of SRD pages fetched at once
+SRD_MAX_CONCURRENCY = 8
+
+# Bytes per block when streaming the monster CSV
+CLEAN_BLOCK_SIZE = 8 << 20
+
+# Text monster columns (typed explicitly so all-empty blocks are not inferred as null)
+TEXT_COLUMNS = ('name', 'size', 'type', 'alignment', 'special_abilities', 'actions')
+
+# Numeric monster columns with their Arrow types and default values
+NUMERIC_DEFAULTS = {
+    'armor_class': ('int16', 10),
+    'hit_points': ('int32', 1),
+    'challenge_rating': ('float32', 0),
+    # Ability scores default to the average score of 10
+    'strength': ('int16', 10),
+    'dexterity': ('int16', 10),
+    'constitution': ('int16', 10),
+    'intelligence': ('int16', 10),
+    'wisdom': ('int16', 10),
+    'charisma': ('int16', 10),
+}
+
+# Column order of the monster CSV
+MONSTER_CSV_COLUMNS = [
+    'name', 'size', 'type', 'alignment', 'armor_class', 'hit_points', 'challenge_rating',
+    'strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma',
+    'special_abilities', 'actions',
+]
+
+# Airflow pool limiting concurrent GCS/BigQuery operations across DAGs
+GCP_POOL = "gcp_bigquery"
+
+# Seconds to wait for a BigQuery job before failing the task
+BIGQUERY_JOB_TIMEOUT = 600
+
+# Explicit BigQuery schema for the cleaned monster data
+MONSTER_SCHEMA = [
+    bigquery.SchemaField('name', 'STRING', mode='REQUIRED'),
+    bigquery.SchemaField('size', 'STRING'),
+    bigquery.SchemaField('type', 'STRING'),
+    bigquery.SchemaField('alignment', 'STRING'),
+    bigquery.SchemaField('armor_class', 'INT64'),
+    bigquery.SchemaField('hit_points', 'INT64'),
+    bigquery.SchemaField('challenge_rating', 'FLOAT64'),
+    bigquery.SchemaField('strength', 'INT64'),
+    bigquery.SchemaField('dexterity', 'INT64'),
+    bigquery.SchemaField('constitution', 'INT64'),
+    bigquery.SchemaField('intelligence', 'INT64'),
+    bigquery.SchemaField('wisdom', 'INT64'),
+    bigquery.SchemaField('charisma', 'INT64'),
+    bigquery.SchemaField('special_abilities', 'STRING'),
+    bigquery.SchemaField('actions', 'STRING'),
+]
 
 # Create DAG instance
 dag = DAG(
@@ -44,11 +108,44 @@ dag = DAG(
     catchup=False,
 )
 
+async def _fetch_srd_pages(sources):
+    """Fetch SRD pages concurrently over one pooled, cached aiohttp session."""
+    import asyncio
+    import aiohttp
+    from aiohttp_client_cache import CachedSession, SQLiteBackend
+    
+    semaphore = asyncio.Semaphore(SRD_MAX_CONCURRENCY)
+    
+    # One session reuses keep-alive connections and negotiates compression;
+    # responses are cached on disk and revalidated with ETag/Last-Modified
+    cache = SQLiteBackend(
+        SRD_HTTP_CACHE,
+        expire_after=HTTP_CACHE_EXPIRE_SECONDS,
+        cache_control=True,
+    )
+    async with CachedSession(
+        cache=cache,
+        connector=aiohttp.TCPConnector(limit=SRD_MAX_CONCURRENCY),
+        headers={'Accept-Encoding': 'gzip, deflate'},
+        timeout=aiohttp.ClientTimeout(total=30),
+    ) as session:
+        
+        async def fetch(source):
+            async with semaphore:
+                try:
+                    async with session.get(source["url"]) as response:
+                        response.raise_for_status()
+                        return source, await response.read(), None
+                except Exception as e:
+                    return source, None, e
+        
+        return await asyncio.gather(*(fetch(source) for source in sources))
+
 def scrape_srd_task(**context):
     """Task to scrape D&D SRD content from online sources."""
+    import asyncio
     import os
-    import requests
-    from bs4 import BeautifulSoup
+    from selectolax.parser import HTMLParser
     
     output_dir = "/tmp/srd_content"
     os.makedirs(output_dir, exist_ok=True)
@@ -61,13 +158,13 @@ def scrape_srd_task(**context):
     ]
     
     scraped_files = []
-    for source in sources:
+    for source, body, error in asyncio.run(_fetch_srd_pages(sources)):
+        if error is not None:
+            print(f"Error scraping {source['url']}: {error}")
+            continue
+        
         try:
-            response = requests.get(source["url"], timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            content = soup.get_text()
+            content = HTMLParser(body).text(separator='\n')
             
             file_path = os.path.join(output_dir, source["filename"])
             with open(file_path, 'w', encoding='utf-8') as f:
@@ -83,78 +180,118 @@ def scrape_srd_task(**context):
     return scraped_files
 
 def clean_monster_data_task(**context):
-    """Task to clean and validate monster data."""
-    import pandas as pd
-    import numpy as np
-    
-    # Example monster data cleaning
-    output_file = "/tmp/cleaned_monsters.csv"
-    
-    # Create sample data (in real implementation, load from Kaggle CSV)
-    sample_data = {
-        'name': ['Goblin', 'Orc', 'Dragon'],
-        'size': ['Small', 'Medium', 'Large'],
-        'type': ['Humanoid', 'Humanoid', 'Dragon'],
-        'alignment': ['Neutral Evil', 'Chaotic Evil', 'Chaotic Evil'],
-        'armor_class': [15, 13, 18],
-        'hit_points': [7, 15, 200],
-        'challenge_rating': [0.25, 0.5, 10.0],
-        'strength': [8, 16, 23],
-        'dexterity': [14, 12, 10],
-        'constitution': [10, 16, 21],
-        'intelligence': [10, 7, 14],
-        'wisdom': [8, 11, 13],
-        'charisma': [8, 10, 17],
-        'special_abilities': ['Nimble Escape', 'Aggressive', 'Legendary Actions'],
-        'actions': ['Scimitar attack', 'Greataxe attack', 'Breath Weapon']
-    }
-    
-    df = pd.DataFrame(sample_data)
-    
-    # Data cleaning operations
-    df['alignment'] = df['alignment'].fillna('Unaligned')
-    df['armor_class'] = pd.to_numeric(df['armor_class'], errors='coerce').fillna(10)
-    df['hit_points'] = pd.to_numeric(df['hit_points'], errors='coerce').fillna(1)
-    df['challenge_rating'] = pd.to_numeric(df['challenge_rating'], errors='coerce').fillna(0)
-    
-    # Save cleaned data
-    df.to_csv(output_file, index=False)
-    
-    context['task_instance'].xcom_push(key='cleaned_monster_file', value=output_file)
-    return output_file
+    """Task to clean monster data and stage it in GCS as Parquet."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+    from google.cloud import storage
+    from monster_data_cleaning import coerce_numeric
+    
+    output_file = "/tmp/cleaned_monsters.parquet"
+    source_file = MONSTER_SOURCE_CSV
+    
+    if DEBUG:
+        # Seed the source CSV with sample data (in real implementation, the Kaggle CSV)
+        _write_sample_monsters_csv(source_file)
+    
+    # Stream the source CSV block by block so peak memory stays bounded;
+    # numeric columns are read as text and coerced below
+    reader = pacsv.open_csv(
+        source_file,
+        read_options=pacsv.ReadOptions(block_size=CLEAN_BLOCK_SIZE),
+        convert_options=pacsv.ConvertOptions(
+            column_types={column: pa.string() for column in (*TEXT_COLUMNS, *NUMERIC_DEFAULTS)},
+            null_values=[''],
+            strings_can_be_null=True,
+        ),
+    )
+    
+    writer = None
+    try:
+        for batch in reader:
+            # Data cleaning operations
+            table = pa.Table.from_batches([batch])
+            alignment_index = table.schema.get_field_index('alignment')
+            table = table.set_column(
+                alignment_index, 'alignment', pc.fill_null(table['alignment'], 'Unaligned')
+            )
+            for column, (target_type, default) in NUMERIC_DEFAULTS.items():
+                index = table.schema.get_field_index(column)
+                table = table.set_column(
+                    index, column, coerce_numeric(table[column], target_type, default)
+                )
+            
+            # Append cleaned block as a Parquet row group
+            if writer is None:
+                writer = pq.ParquetWriter(output_file, table.schema, compression='snappy')
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    # An empty source would leave no file to stage, and the WRITE_TRUNCATE
+    # load would empty the table, so fail instead
+    if writer is None:
+        raise ValueError(f"No monster rows found in {source_file}")
+    
+    # Stage the Parquet file in GCS for the BigQuery load job
+    blob_name = os.path.basename(output_file)
+    storage.Client(project=PROJECT_ID).bucket(DATA_BUCKET).blob(blob_name).upload_from_filename(output_file)
+    cleaned_uri = f"gs://{DATA_BUCKET}/{blob_name}"
+    
+    context['task_instance'].xcom_push(key='cleaned_monster_uri', value=cleaned_uri)
+    return cleaned_uri
+
+def _write_sample_monsters_csv(path):
+    """Write a small sample monster CSV for local debugging runs."""
+    import csv
+    
+    sample_rows = [
+        ('Goblin', 'Small', 'Humanoid', 'Neutral Evil', 15, 7, 0.25, 8, 14, 10, 10, 8, 8, 'Nimble Escape', 'Scimitar attack'),
+        ('Orc', 'Medium', 'Humanoid', 'Chaotic Evil', 13, 15, 0.5, 16, 12, 16, 7, 11, 10, 'Aggressive', 'Greataxe attack'),
+        ('Dragon', 'Large', 'Dragon', 'Chaotic Evil', 18, 200, 10.0, 23, 10, 21, 14, 13, 17, 'Legendary Actions', 'Breath Weapon'),
+    ]
+    
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(MONSTER_CSV_COLUMNS)
+        writer.writerows(sample_rows)
 
 def load_bigquery_data(**context):
     """Task to load cleaned monster data into BigQuery."""
-    import pandas as pd
-    from google.cloud import bigquery
-    
-    # Get cleaned data file
-    cleaned_file = context['task_instance'].xcom_pull(
-        key='cleaned_monster_file', 
+    # Get the staged Parquet file
+    cleaned_uri = context['task_instance'].xcom_pull(
+        key='cleaned_monster_uri', 
         task_ids='clean_monster_data'
     )
     
-    # Read cleaned data
-    df = pd.read_csv(cleaned_file)
-    
     # Load to BigQuery
     client = bigquery.Client(project=PROJECT_ID)
     table_id = f"{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}"
     
     job_config = bigquery.LoadJobConfig(
         write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
-        source_format=bigquery.SourceFormat.CSV,
-        skip_leading_rows=1,
-        autodetect=True,
+        source_format=bigquery.SourceFormat.PARQUET,
+        schema=MONSTER_SCHEMA,
     )
     
-    with open(cleaned_file, "rb") as source_file:
-        job = client.load_table_from_file(source_file, table_id, job_config=job_config)
+    job = client.load_table_from_uri(cleaned_uri, table_id, job_config=job_config)
     
-    job.result()  # Wait for the job to complete
+    # Wait for the job, retrying transient errors with exponential backoff
+    job.result(
+        timeout=BIGQUERY_JOB_TIMEOUT,
+        retry=retry.Retry(
+            predicate=retry.if_transient_error,
+            initial=1.0,
+            maximum=60.0,
+            multiplier=2.0,
+            deadline=BIGQUERY_JOB_TIMEOUT,
+        ),
+    )
     
-    print(f"Successfully loaded {len(df)} monster records to BigQuery")
-    return len(df)
+    print(f"Successfully loaded {job.output_rows} monster records to BigQuery")
+    return job.output_rows
 
 # Define tasks
 scrape_srd = PythonOperator(
@@ -166,6 +303,8 @@ scrape_srd = PythonOperator(
 clean_monster_data = PythonOperator(
     task_id='clean_monster_data',
     python_callable=clean_monster_data_task,
+    pool=GCP_POOL,
+    pool_slots=1,
     dag=dag,
 )
 
@@ -174,12 +313,16 @@ upload_srd_files = LocalFilesystemToGCSOperator(
     src='/tmp/srd_content/',
     dst='srd_content/',
     bucket=DATA_BUCKET,
+    pool=GCP_POOL,
+    pool_slots=1,
     dag=dag,
 )
 
 load_monster_data = PythonOperator(
     task_id='load_monster_data',
     python_callable=load_bigquery_data,
+    pool=GCP_POOL,
+    pool_slots=1,
     dag=dag,
 )
 
@@ -0,0 +1,42 @@
+"""
+Monster data transformation and validation helpers for the ingestion DAG.
+
+Kept free of Airflow imports so the Arrow cleaning steps can be tested on
+their own.
+"""
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Text values that can be parsed as a number (optionally with an exponent)
+NUMBER_PATTERN = r'^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$'
+
+
+def coerce_numeric(column, target_type, default):
+    """
+    Cast a text column to a numeric type, replacing unparseable or missing values with a default.
+
+    Values are parsed as float64 first, so integer columns accept text such as
+    '12.0' (fractions are truncated). Integers outside the range of the target
+    type also take the default instead of wrapping around.
+
+    Args:
+        column: Arrow string array or chunked array
+        target_type: Arrow type alias such as 'int16' or 'float32'
+        default: Value used for missing, unparseable and out-of-range entries
+    """
+    target_type = pa.type_for_alias(target_type)
+    trimmed = pc.utf8_trim_whitespace(column)
+    parseable = pc.match_substring_regex(trimmed, NUMBER_PATTERN)
+    numeric = pc.cast(pc.if_else(parseable, trimmed, pa.scalar(None, pa.string())), pa.float64())
+
+    if pa.types.is_integer(target_type):
+        bits = target_type.bit_width
+        if pa.types.is_signed_integer(target_type):
+            low, high = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+        else:
+            low, high = 0, (1 << bits) - 1
+        in_range = pc.and_(pc.greater_equal(numeric, low), pc.less_equal(numeric, high))
+        numeric = pc.if_else(in_range, numeric, pa.scalar(None, pa.float64()))
+
+    return pc.fill_null(pc.cast(numeric, target_type, safe=False), pa.scalar(default, type=target_type))
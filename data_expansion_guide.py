@@ -4,55 +4,165 @@ Data Expansion Guide for Dungeon Master's Oracle
 Load hundreds of D&D monsters from various sources
 """
 
+import asyncio
+import hashlib
 import os
 import sys
+import time
+import httpx
 import pandas as pd
-import requests
-import json
-from typing import List, Dict, Any
+import orjson
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Tuple
 from dotenv import load_dotenv
 
 # Add sql_schema to path
 sys.path.append('sql_schema')
-from monsters_schema import insert_monster_data, validate_monster_data
+from monsters_schema import MonsterStagingFile, validate_monster_data, validate_monsters_batch
 
 load_dotenv()
 
-def download_dnd_5e_api_monsters():
-    """Download monsters from the D&D 5e API."""
+DND_API_BASE = "https://www.dnd5eapi.co"
+
+# Number of monster detail pages downloaded, and how many are fetched at once
+API_DOWNLOAD_LIMIT = 50
+API_MAX_CONCURRENCY = 20
+
+# Validated monsters are written to the load file in groups of this size
+STAGING_BATCH_SIZE = 100
+
+# Sent on every API request; failed connection attempts are retried
+API_HEADERS = {"Accept": "application/json", "User-Agent": "dnd-oracle/1.0"}
+API_CONNECT_RETRIES = 3
+
+# SRD payloads rarely change, so API responses are cached on disk between runs
+API_CACHE_DIR = Path(".dnd_api_cache")
+API_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Ability score order in stat blocks, and the signed modifier for every legal
+# score (0-30), formatted once
+ABILITY_KEYS = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma")
+ABILITY_MODIFIERS = tuple(f"{(score - 10) // 2:+d}" for score in range(31))
+
+def format_ability(key: str, score: int) -> str:
+    """Format one ability score as stat-block text, e.g. 'STR 18 (+4)'."""
+    modifier = ABILITY_MODIFIERS[score] if 0 <= score <= 30 else f"{(score - 10) // 2:+d}"
+    return f"{key[:3].upper()} {score} ({modifier})"
+
+def _format_speed(speed_obj: Any) -> str:
+    """Speed mapping ({'walk': '30 ft.', ...}) as stat-block text; defaults to 30 ft."""
+    if not isinstance(speed_obj, dict):
+        return "30 ft."
+    return ", ".join(f"{speed_type} {value}"
+                     for speed_type, value in speed_obj.items() if speed_type != 'hover') or "30 ft."
+
+# Normalizers for API fields that arrive either as an object or a scalar, so
+# shape differences are handled in one place
+_COERCERS = {
+    'alignment': lambda value: value.get('name', 'Neutral') if isinstance(value, dict) else str(value),
+    'speed': _format_speed,
+    'challenge_rating': lambda value: str(value) if isinstance(value, (int, float)) else "0",
+}
+
+async def get_api_json(client: httpx.AsyncClient, url: str, timeout: float) -> Any:
+    """
+    GET a D&D 5e API path, serving it from the on-disk cache when fresh.
+    
+    Stale cache entries are revalidated with a conditional request using the
+    stored ETag / Last-Modified headers; a 304 reuses the cached body.
+    """
+    cache_key = hashlib.md5(url.encode("utf-8")).hexdigest()
+    cache_path = API_CACHE_DIR / (cache_key + ".json")
+    validators_path = API_CACHE_DIR / (cache_key + ".headers.json")
+    
+    conditional_headers = {}
+    try:
+        if time.time() - cache_path.stat().st_mtime < API_CACHE_TTL_SECONDS:
+            return orjson.loads(cache_path.read_bytes())
+        validators = orjson.loads(validators_path.read_bytes())
+        if validators.get("etag"):
+            conditional_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = validators["last_modified"]
+    except (OSError, ValueError):
+        pass
+    
+    response = await client.get(url, timeout=timeout, headers=conditional_headers)
+    if response.status_code == 304 and conditional_headers:
+        try:
+            data = orjson.loads(cache_path.read_bytes())
+            cache_path.touch()  # fresh again for another TTL
+            return data
+        except (OSError, ValueError):
+            # Cached body unusable; fetch it unconditionally
+            response = await client.get(url, timeout=timeout)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    
+    # Only successful, well-formed responses reach the cache
+    try:
+        API_CACHE_DIR.mkdir(exist_ok=True)
+        cache_path.write_bytes(response.content)
+        validators_path.write_bytes(orjson.dumps({
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }))
+    except OSError as e:
+        print(f"⚠️  Could not cache {url}: {e}")
+    return data
+
+async def download_dnd_5e_api_monsters(limit: int = API_DOWNLOAD_LIMIT) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Download monsters from the D&D 5e API, fetching detail pages concurrently.
+    
+    Formatted monsters are yielded as their detail pages arrive, so callers can
+    process them without waiting for (or holding) the whole download.
+    """
     print("🐉 Downloading monsters from D&D 5e API...")
     
     try:
-        # Get list of all monsters
-        response = requests.get("https://www.dnd5eapi.co/api/monsters", timeout=10)
-        monsters_list = response.json()['results']
-        
-        print(f"📋 Found {len(monsters_list)} monsters in API")
-        
-        detailed_monsters = []
-        
-        for i, monster_ref in enumerate(monsters_list[:50], 1):  # Limit to first 50 for now
-            print(f"⏬ Downloading {i}/50: {monster_ref['name']}")
+        # One pooled client for the list and every detail request
+        limits = httpx.Limits(max_connections=API_MAX_CONCURRENCY, max_keepalive_connections=API_MAX_CONCURRENCY)
+        async with httpx.AsyncClient(
+            base_url=DND_API_BASE,
+            headers=API_HEADERS,
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=API_CONNECT_RETRIES),
+        ) as client:
+            # Get list of all monsters
+            monsters_list = (await get_api_json(client, "/api/monsters", timeout=10))['results']
+            
+            print(f"📋 Found {len(monsters_list)} monsters in API")
             
-            try:
-                detail_response = requests.get(f"https://www.dnd5eapi.co{monster_ref['url']}", timeout=5)
-                monster_detail = detail_response.json()
+            semaphore = asyncio.Semaphore(API_MAX_CONCURRENCY)
+            selected = monsters_list[:limit]
+            
+            async def fetch(monster_ref):
+                async with semaphore:
+                    try:
+                        return monster_ref, await get_api_json(client, monster_ref['url'], timeout=5)
+                    except Exception as e:
+                        return monster_ref, e
+            
+            processed = 0
+            for i, completed in enumerate(asyncio.as_completed([fetch(ref) for ref in selected]), 1):
+                monster_ref, monster_detail = await completed
+                if isinstance(monster_detail, Exception):
+                    print(f"⚠️  Failed to get details for {monster_ref['name']}: {monster_detail}")
+                    continue
+                print(f"⏬ Downloaded {i}/{len(selected)}: {monster_ref['name']}")
                 
                 # Convert to our schema format
                 formatted_monster = format_api_monster(monster_detail)
                 if formatted_monster:
-                    detailed_monsters.append(formatted_monster)
-                    
-            except Exception as e:
-                print(f"⚠️  Failed to get details for {monster_ref['name']}: {e}")
-                continue
+                    processed += 1
+                    yield formatted_monster
         
-        print(f"✅ Successfully processed {len(detailed_monsters)} monsters")
-        return detailed_monsters
+        print(f"✅ Successfully processed {processed} monsters")
         
     except Exception as e:
         print(f"❌ Failed to download from D&D 5e API: {e}")
-        return []
 
 def format_api_monster(monster: Dict) -> Dict[str, Any]:
     """Convert D&D 5e API format to our BigQuery schema."""
@@ -62,12 +172,8 @@ def format_api_monster(monster: Dict) -> Dict[str, Any]:
         size = monster.get('size', 'Medium')
         monster_type = monster.get('type', 'Unknown')
         
-        # Handle alignment
-        alignment_obj = monster.get('alignment', 'Neutral')
-        if isinstance(alignment_obj, dict):
-            alignment = alignment_obj.get('name', 'Neutral')
-        else:
-            alignment = str(alignment_obj)
+        # Fields whose shape varies between API versions
+        alignment = _COERCERS['alignment'](monster.get('alignment', 'Neutral'))
         
         # Extract stats
         armor_class = None
@@ -76,45 +182,25 @@ def format_api_monster(monster: Dict) -> Dict[str, Any]:
         
         hit_points = monster.get('hit_points', 1)
         
-        # Handle speed
-        speed_obj = monster.get('speed', {})
-        if isinstance(speed_obj, dict):
-            speed_parts = []
-            for speed_type, value in speed_obj.items():
-                if speed_type != 'hover':
-                    speed_parts.append(f"{speed_type} {value}")
-            speed = ", ".join(speed_parts) if speed_parts else "30 ft."
-        else:
-            speed = "30 ft."
-        
-        # Challenge rating
-        cr = monster.get('challenge_rating', 0)
-        if isinstance(cr, (int, float)):
-            challenge_rating = str(cr)
-        else:
-            challenge_rating = "0"
+        speed = _COERCERS['speed'](monster.get('speed', {}))
+        challenge_rating = _COERCERS['challenge_rating'](monster.get('challenge_rating', 0))
         
         # Abilities
         abilities_obj = monster.get('ability_scores', {})
         if abilities_obj:
-            abilities = f"STR {abilities_obj.get('strength', 10)} ({(abilities_obj.get('strength', 10)-10)//2:+d}), " \
-                       f"DEX {abilities_obj.get('dexterity', 10)} ({(abilities_obj.get('dexterity', 10)-10)//2:+d}), " \
-                       f"CON {abilities_obj.get('constitution', 10)} ({(abilities_obj.get('constitution', 10)-10)//2:+d}), " \
-                       f"INT {abilities_obj.get('intelligence', 10)} ({(abilities_obj.get('intelligence', 10)-10)//2:+d}), " \
-                       f"WIS {abilities_obj.get('wisdom', 10)} ({(abilities_obj.get('wisdom', 10)-10)//2:+d}), " \
-                       f"CHA {abilities_obj.get('charisma', 10)} ({(abilities_obj.get('charisma', 10)-10)//2:+d})"
+            abilities = ", ".join(format_ability(key, abilities_obj.get(key, 10)) for key in ABILITY_KEYS)
         else:
             abilities = "STR 10 (+0), DEX 10 (+0), CON 10 (+0), INT 10 (+0), WIS 10 (+0), CHA 10 (+0)"
         
         # Skills
         skills_list = monster.get('proficiencies', [])
-        skills = ", ".join([f"{skill['proficiency']['name']}: +{skill['value']}" 
-                           for skill in skills_list if 'Skill:' in skill['proficiency']['name']])
+        skills = ", ".join(f"{skill['proficiency']['name']}: +{skill['value']}"
+                           for skill in skills_list if 'Skill:' in skill['proficiency']['name'])
         
         # Damage resistances/immunities
-        damage_resistances = ", ".join(monster.get('damage_resistances', []))
-        damage_immunities = ", ".join(monster.get('damage_immunities', []))
-        condition_immunities = ", ".join([ci['name'] for ci in monster.get('condition_immunities', [])])
+        damage_resistances = list(monster.get('damage_resistances', []))
+        damage_immunities = list(monster.get('damage_immunities', []))
+        condition_immunities = ", ".join(ci['name'] for ci in monster.get('condition_immunities', []))
         
         # Senses
         senses_obj = monster.get('senses', {})
@@ -132,18 +218,18 @@ def format_api_monster(monster: Dict) -> Dict[str, Any]:
         
         # Special abilities
         special_abilities_list = monster.get('special_abilities', [])
-        special_abilities = "; ".join([f"{sa['name']}: {sa.get('desc', '')}" 
-                                     for sa in special_abilities_list])
+        special_abilities = "; ".join(f"{sa['name']}: {sa.get('desc', '')}"
+                                     for sa in special_abilities_list)
         
         # Actions
         actions_list = monster.get('actions', [])
-        actions = "; ".join([f"{action['name']}: {action.get('desc', '')}" 
-                           for action in actions_list])
+        actions = "; ".join(f"{action['name']}: {action.get('desc', '')}"
+                           for action in actions_list)
         
         # Legendary actions
         legendary_actions_list = monster.get('legendary_actions', [])
-        legendary_actions = "; ".join([f"{la['name']}: {la.get('desc', '')}" 
-                                     for la in legendary_actions_list]) if legendary_actions_list else None
+        legendary_actions = "; ".join(f"{la['name']}: {la.get('desc', '')}"
+                                     for la in legendary_actions_list) if legendary_actions_list else None
         
         formatted_monster = {
             'name': name,
@@ -155,8 +241,8 @@ def format_api_monster(monster: Dict) -> Dict[str, Any]:
             'challenge_rating': challenge_rating,
             'abilities': abilities,
             'skills': skills if skills else None,
-            'damage_resistances': damage_resistances if damage_resistances else None,
-            'damage_immunities': damage_immunities if damage_immunities else None,
+            'damage_resistances': damage_resistances,
+            'damage_immunities': damage_immunities,
             'condition_immunities': condition_immunities if condition_immunities else None,
             'senses': senses,
             'languages': languages,
@@ -187,8 +273,8 @@ def create_additional_monsters():
             'challenge_rating': '1',
             'abilities': 'STR 17 (+3), DEX 15 (+2), CON 15 (+2), INT 3 (-4), WIS 12 (+1), CHA 7 (-2)',
             'skills': 'Perception +3, Stealth +4',
-            'damage_resistances': None,
-            'damage_immunities': None,
+            'damage_resistances': [],
+            'damage_immunities': [],
             'condition_immunities': None,
             'senses': 'Darkvision 60 ft., Passive Perception 13',
             'languages': None,
@@ -207,8 +293,8 @@ def create_additional_monsters():
             'challenge_rating': '5',
             'abilities': 'STR 18 (+4), DEX 13 (+1), CON 20 (+5), INT 7 (-2), WIS 9 (-1), CHA 7 (-2)',
             'skills': 'Perception +2',
-            'damage_resistances': None,
-            'damage_immunities': None,
+            'damage_resistances': [],
+            'damage_immunities': [],
             'condition_immunities': None,
             'senses': 'Darkvision 60 ft., Passive Perception 12',
             'languages': 'Giant',
@@ -227,8 +313,8 @@ def create_additional_monsters():
             'challenge_rating': '7',
             'abilities': 'STR 11 (+0), DEX 12 (+1), CON 12 (+1), INT 19 (+4), WIS 17 (+3), CHA 17 (+3)',
             'skills': 'Arcana +7, Deception +6, Insight +6, Perception +6, Persuasion +6, Stealth +4',
-            'damage_resistances': None,
-            'damage_immunities': None,
+            'damage_resistances': [],
+            'damage_immunities': [],
             'condition_immunities': None,
             'senses': 'Darkvision 120 ft., Passive Perception 16',
             'languages': 'Deep Speech, Undercommon, telepathy 120 ft.',
@@ -241,32 +327,86 @@ def create_additional_monsters():
     
     return additional_monsters
 
-def load_monsters_to_bigquery(monsters: List[Dict]):
-    """Load monsters into BigQuery."""
-    print(f"📊 Loading {len(monsters)} monsters to BigQuery...")
+def validate_staging_batch(monsters: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
+    """
+    Validate a batch of monsters in one pydantic-core call.
+    
+    If any row is invalid, the batch is re-validated row by row so only the
+    bad monsters are dropped. Runs in worker processes, so failures are
+    returned as (name, message) pairs rather than raised or printed.
+    
+    Returns:
+        The validated monsters and the validation failures
+    """
+    try:
+        return validate_monsters_batch(monsters), []
+    except ValueError:
+        pass
+    
+    validated_monsters, failures = [], []
+    for monster in monsters:
+        try:
+            validated_monsters.append(validate_monster_data(monster))
+        except Exception as e:
+            failures.append((monster.get('name', 'Unknown'), str(e)))
+    return validated_monsters, failures
+
+async def expansion_monsters(use_api: bool, use_custom: bool) -> AsyncIterator[Dict[str, Any]]:
+    """Yield monsters from every selected source, in order."""
+    if use_api:
+        async for monster in download_dnd_5e_api_monsters():
+            yield monster
+    if use_custom:
+        for monster in create_additional_monsters():
+            yield monster
+
+async def load_monsters_to_bigquery(monsters: AsyncIterable[Dict[str, Any]]) -> bool:
+    """
+    Load monsters into BigQuery.
+    
+    Monsters are grouped into batches of STAGING_BATCH_SIZE as they arrive.
+    Each batch is validated in a worker process while the next one is still
+    being collected, and validated batches are staged to disk in order. The
+    staged file is then appended with one load job.
+    """
+    print("📊 Loading monsters to BigQuery...")
     
     project_id = os.getenv("PROJECT_ID", "dandd-oracle")
+    loop = asyncio.get_running_loop()
+    
+    def stage(validation: Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]) -> None:
+        validated_monsters, failures = validation
+        for name, error in failures:
+            print(f"⚠️  Validation failed for {name}: {error}")
+        staging.write(validated_monsters)
     
     try:
-        # Validate all monsters first
-        validated_monsters = []
-        for monster in monsters:
-            try:
-                validated_monster = validate_monster_data(monster)
-                validated_monsters.append(validated_monster)
-            except Exception as e:
-                print(f"⚠️  Validation failed for {monster.get('name', 'Unknown')}: {e}")
-                continue
-        
-        print(f"✅ Validated {len(validated_monsters)} monsters")
-        
-        if validated_monsters:
-            insert_monster_data(project_id, validated_monsters)
-            print(f"🎉 Successfully loaded {len(validated_monsters)} monsters to BigQuery!")
-            return True
-        else:
-            print("❌ No valid monsters to load")
-            return False
+        with MonsterStagingFile() as staging, ProcessPoolExecutor() as pool:
+            pending = deque()
+            batch = []
+            async for monster in monsters:
+                batch.append(monster)
+                if len(batch) >= STAGING_BATCH_SIZE:
+                    pending.append(loop.run_in_executor(pool, validate_staging_batch, batch))
+                    batch = []
+                # Stage finished batches as soon as they are ready, in order
+                while pending and pending[0].done():
+                    stage(pending.popleft().result())
+            if batch:
+                pending.append(loop.run_in_executor(pool, validate_staging_batch, batch))
+            while pending:
+                stage(await pending.popleft())
+            
+            print(f"✅ Validated {staging.row_count} monsters")
+            
+            if staging.row_count:
+                # One load job for the whole set, however many monsters there are
+                loaded = staging.load(project_id)
+                print(f"🎉 Successfully loaded {loaded} monsters to BigQuery!")
+                return True
+            else:
+                print("❌ No valid monsters to load")
+                return False
             
     except Exception as e:
         print(f"❌ Failed to load monsters to BigQuery: {e}")
@@ -281,28 +421,20 @@ def main():
     print(f"🎯 Goal: 100+ monsters for a useful D&D tool")
     print()
     
-    all_monsters = []
-    
     # Option 1: Download from D&D 5e API
     print("Option 1: Download from D&D 5e API")
-    response = input("Download 50 monsters from D&D 5e API? (y/N): ")
-    if response.lower() == 'y':
-        api_monsters = download_dnd_5e_api_monsters()
-        all_monsters.extend(api_monsters)
+    use_api = input(f"Download {API_DOWNLOAD_LIMIT} monsters from D&D 5e API? (y/N): ").lower() == 'y'
     
     # Option 2: Add custom monsters
     print("\nOption 2: Add custom monsters")
-    response = input("Add 3 additional custom monsters? (y/N): ")
-    if response.lower() == 'y':
-        custom_monsters = create_additional_monsters()
-        all_monsters.extend(custom_monsters)
+    use_custom = input("Add 3 additional custom monsters? (y/N): ").lower() == 'y'
     
-    # Load to BigQuery
-    if all_monsters:
-        print(f"\n📊 Total monsters to load: {len(all_monsters)}")
-        response = input("Load all monsters to BigQuery? (y/N): ")
+    # Load to BigQuery; monsters are downloaded, validated and staged as a
+    # stream rather than collected in memory first
+    if use_api or use_custom:
+        response = input("\nLoad the selected monsters to BigQuery? (y/N): ")
         if response.lower() == 'y':
-            success = load_monsters_to_bigquery(all_monsters)
+            success = asyncio.run(load_monsters_to_bigquery(expansion_monsters(use_api, use_custom)))
             if success:
                 print("\n🎉 Data expansion completed!")
                 print(f"Your Oracle now has much more data to work with!")
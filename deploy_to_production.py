@@ -4,71 +4,171 @@ Deploy Dungeon Master's Oracle to Google Cloud Production
 Complete deployment automation script
 """
 
+import json
 import os
+import shlex
+import shutil
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def run_command(command, description, check=True):
-    """Run a shell command with proper error handling."""
+# Stamp file remembering recent prerequisite and authentication checks
+PREREQ_STAMP_FILE = os.path.expanduser("~/.cache/dm-oracle/prereq.json")
+PREREQ_STAMP_MAX_AGE = 24 * 60 * 60
+
+def run_command(command, description, check=True, capture=False):
+    """
+    Run a command with proper error handling.
+    
+    The command is an argv list executed without a shell. Output is streamed
+    line by line as it is produced; it is only kept in memory (and returned
+    on ``result.stdout``) when ``capture`` is True.
+    """
     print(f"\n🔄 {description}")
-    print(f"Command: {command}")
+    print(f"Command: {shlex.join(command)}")
     
+    captured = []
     try:
-        result = subprocess.run(command, shell=True, check=check, capture_output=True, text=True)
-        if result.stdout:
-            print(f"✅ Output: {result.stdout.strip()}")
-        return result
-    except subprocess.CalledProcessError as e:
+        with subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        ) as proc:
+            for line in proc.stdout:
+                print(f"   {line.rstrip()}")
+                if capture:
+                    captured.append(line)
+            returncode = proc.wait()
+    except OSError as e:
         print(f"❌ Error: {e}")
-        if e.stderr:
-            print(f"Error details: {e.stderr}")
         if check:
             sys.exit(1)
-        return e
+        return subprocess.CompletedProcess(command, 127, stdout="")
+    
+    result = subprocess.CompletedProcess(command, returncode, stdout="".join(captured))
+    if returncode != 0:
+        print(f"❌ Error: command exited with status {returncode}")
+        if check:
+            sys.exit(1)
+    else:
+        print("✅ Done")
+    return result
+
+def _read_prereq_stamp_file():
+    """Return the raw prerequisite stamp file contents, or an empty dict."""
+    try:
+        with open(PREREQ_STAMP_FILE) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return stamp if isinstance(stamp, dict) else {}
+
+def load_prereq_stamp():
+    """Load the prerequisite stamp fields that were recorded recently."""
+    now = time.time()
+    return {
+        field: entry["value"]
+        for field, entry in _read_prereq_stamp_file().items()
+        # Each field carries its own timestamp, so refreshing one field does
+        # not extend the others
+        if isinstance(entry, dict) and "value" in entry and now - entry.get("ts", 0) <= PREREQ_STAMP_MAX_AGE
+    }
+
+def save_prereq_stamp(**fields):
+    """Merge fields into the prerequisite stamp file, timestamping each one."""
+    stamp = {
+        field: entry for field, entry in _read_prereq_stamp_file().items()
+        if isinstance(entry, dict)
+    }
+    now = time.time()
+    stamp.update({field: {"value": value, "ts": now} for field, value in fields.items()})
+    
+    os.makedirs(os.path.dirname(PREREQ_STAMP_FILE), exist_ok=True)
+    with open(PREREQ_STAMP_FILE, "w") as f:
+        json.dump(stamp, f)
+
+def get_active_gcloud_account():
+    """Return the active gcloud account, or None if there is none (a local check, no network)."""
+    try:
+        result = subprocess.run(
+            ["gcloud", "auth", "list", "--filter=status:ACTIVE", "--format=value(account)"],
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+def check_tool(command):
+    """Return the first line of a tool's version output, or None if it fails."""
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        return result.stdout.strip().splitlines()[0] if result.stdout.strip() else command[0]
+    except (OSError, subprocess.CalledProcessError):
+        return None
 
 def check_prerequisites():
     """Check if all required tools are installed."""
     print("🔍 Checking Prerequisites...")
     
     tools = {
-        "gcloud": "gcloud --version",
-        "terraform": "terraform --version",
-        "docker": "docker --version"
+        "gcloud": ["gcloud", "--version"],
+        "terraform": ["terraform", "--version"],
+        "docker": ["docker", "--version"]
     }
     
-    for tool, command in tools.items():
-        try:
-            result = subprocess.run(command, shell=True, capture_output=True, text=True, check=True)
+    # Skip the version checks if they passed recently for the same binaries
+    tool_paths = {tool: shutil.which(command[0]) for tool, command in tools.items()}
+    stamp = load_prereq_stamp()
+    if stamp.get("tool_paths") == tool_paths and stamp.get("versions"):
+        for tool, version in stamp["versions"].items():
+            print(f"✅ {tool}: Found ({version}, cached)")
+        return True
+    
+    # Run the version checks concurrently
+    with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+        versions = dict(zip(tools, executor.map(check_tool, tools.values())))
+    
+    for tool, version in versions.items():
+        if version:
             print(f"✅ {tool}: Found")
-        except subprocess.CalledProcessError:
+        else:
             print(f"❌ {tool}: Not found or not working")
             print(f"Please install {tool} and try again")
             return False
     
+    save_prereq_stamp(tool_paths=tool_paths, versions=versions)
     return True
 
 def setup_gcp_authentication():
     """Ensure GCP authentication is set up."""
     print("\n🔐 Setting up GCP Authentication...")
     
-    # Check if already authenticated
-    result = run_command("gcloud auth list", "Checking current authentication", check=False)
-    
-    if "No credentialed accounts" in result.stdout or result.returncode != 0:
+    # The active account is checked on every run (a local lookup), so revoked
+    # or switched credentials are never trusted from the stamp
+    account = get_active_gcloud_account()
+    if account is None:
         print("🔑 Need to authenticate with GCP...")
-        run_command("gcloud auth login", "Authenticating with GCP")
-        run_command("gcloud auth application-default login", "Setting up application default credentials")
+        run_command(["gcloud", "auth", "login"], "Authenticating with GCP")
+        run_command(["gcloud", "auth", "application-default", "login"], "Setting up application default credentials")
+        account = get_active_gcloud_account()
     else:
-        print("✅ Already authenticated with GCP")
+        previous_account = load_prereq_stamp().get("gcloud_account")
+        if previous_account and previous_account != account:
+            print(f"⚠️  Active gcloud account changed from {previous_account} to {account}")
+        print(f"✅ Already authenticated with GCP as {account}")
+    
+    if account:
+        save_prereq_stamp(gcloud_account=account)
     
     # Set project
     project_id = os.getenv("PROJECT_ID", "dandd-oracle")
-    run_command(f"gcloud config set project {project_id}", f"Setting project to {project_id}")
+    run_command(["gcloud", "config", "set", "project", project_id], f"Setting project to {project_id}")
 
 def enable_required_apis():
     """Enable all required GCP APIs."""
@@ -84,8 +184,8 @@ def enable_required_apis():
         "secretmanager.googleapis.com"
     ]
     
-    for api in apis:
-        run_command(f"gcloud services enable {api}", f"Enabling {api}")
+    # gcloud accepts several services per invocation
+    run_command(["gcloud", "services", "enable", *apis], "Enabling GCP APIs")
 
 def deploy_infrastructure():
     """Deploy infrastructure using Terraform."""
@@ -94,10 +194,10 @@ def deploy_infrastructure():
     os.chdir("infrastructure")
     
     # Initialize Terraform
-    run_command("terraform init", "Initializing Terraform")
+    run_command(["terraform", "init"], "Initializing Terraform")
     
     # Plan deployment
-    run_command("terraform plan", "Planning infrastructure deployment")
+    run_command(["terraform", "plan"], "Planning infrastructure deployment")
     
     # Ask for confirmation
     response = input("\n❓ Do you want to apply the infrastructure changes? (y/N): ")
@@ -106,10 +206,10 @@ def deploy_infrastructure():
         return False
     
     # Apply infrastructure
-    run_command("terraform apply -auto-approve", "Applying infrastructure changes")
+    run_command(["terraform", "apply", "-auto-approve"], "Applying infrastructure changes")
     
     # Get outputs
-    run_command("terraform output", "Getting infrastructure outputs")
+    run_command(["terraform", "output"], "Getting infrastructure outputs")
     
     os.chdir("..")
     return True
@@ -120,7 +220,7 @@ def build_and_deploy_app():
     
     # Build and submit to Cloud Build
     run_command(
-        "gcloud builds submit --config cloudbuild.yaml .",
+        ["gcloud", "builds", "submit", "--config", "cloudbuild.yaml", "."],
         "Building and deploying application with Cloud Build"
     )
 
@@ -130,9 +230,11 @@ def verify_deployment():
     
     # Get the service URL
     result = run_command(
-        "gcloud run services describe dm-oracle-api --region=us-central1 --format='value(status.url)'",
+        ["gcloud", "run", "services", "describe", "dm-oracle-api",
+         "--region=us-central1", "--format=value(status.url)"],
         "Getting service URL",
-        check=False
+        check=False,
+        capture=True
     )
     
     if result.returncode == 0 and result.stdout.strip():
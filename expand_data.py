@@ -4,7 +4,8 @@ Expand D&D Monster Database
 Quick script to add more monsters from the D&D 5e API
 """
 
-import requests
+import asyncio
+import httpx
 import os
 import sys
 from dotenv import load_dotenv
@@ -12,95 +13,154 @@ from dotenv import load_dotenv
 # Add sql_schema to path
 sys.path.append('sql_schema')
 from monsters_schema import insert_monster_data
+# Shares the on-disk D&D 5e API cache (revalidated with ETag/Last-Modified)
+from data_expansion_guide import DND_API_BASE, get_api_json
 
 load_dotenv()
 
-def get_monsters_from_api(limit=20):
-    """Get monsters from D&D 5e API."""
+# Monsters fetched and inserted per batch
+BATCH_SIZE = 500
+
+def api_client():
+    """Create the pooled client used for D&D 5e API requests."""
+    return httpx.AsyncClient(
+        base_url=DND_API_BASE,
+        limits=httpx.Limits(max_connections=20),
+        timeout=30,
+    )
+
+async def fetch_monster_list():
+    """Fetch the index of all monsters from the D&D 5e API (cached on disk)."""
+    async with api_client() as client:
+        return (await get_api_json(client, "/api/monsters", timeout=30))['results']
+
+async def fetch_monster_detail(client, monster_ref):
+    """Fetch a single monster's details from the D&D 5e API (cached on disk)."""
+    return await get_api_json(client, monster_ref['url'], timeout=30)
+
+async def fetch_monster_details(monsters_list):
+    """Fetch all monster details concurrently over a shared connection pool."""
+    async with api_client() as client:
+        return await asyncio.gather(
+            *(fetch_monster_detail(client, ref) for ref in monsters_list),
+            return_exceptions=True
+        )
+
+def format_monster(monster):
+    """Convert a D&D 5e API monster to our schema."""
+    return {
+        'name': monster.get('name', 'Unknown'),
+        'type': monster.get('type', 'Beast'),
+        'size': monster.get('size', 'Medium'),
+        'armor_class': monster.get('armor_class', [{}])[0].get('value', 10),
+        'hit_points': monster.get('hit_points', 1),
+        'speed': f"walk {monster.get('speed', {}).get('walk', '30 ft.')}",
+        'challenge_rating': str(monster.get('challenge_rating', 0)),
+        'abilities': format_abilities(monster.get('ability_scores', {})),
+        'skills': format_skills(monster.get('proficiencies', [])),
+        'damage_resistances': list(monster.get('damage_resistances', [])),
+        'damage_immunities': list(monster.get('damage_immunities', [])),
+        'condition_immunities': ', '.join([ci['name'] for ci in monster.get('condition_immunities', [])]) or None,
+        'senses': format_senses(monster.get('senses', {})),
+        'languages': ', '.join(monster.get('languages', [])) or None,
+        'special_abilities': format_abilities_list(monster.get('special_abilities', [])),
+        'actions': format_abilities_list(monster.get('actions', [])),
+        'legendary_actions': format_abilities_list(monster.get('legendary_actions', [])),
+        'source': 'D&D 5e SRD'
+    }
+
+def iter_monster_batches(limit=20, batch_size=BATCH_SIZE):
+    """
+    Yield formatted monsters from the D&D 5e API in batches.
+    
+    Details are fetched concurrently one batch at a time, so only a single
+    batch of raw and formatted monsters is held in memory.
+    """
     print(f"🐉 Downloading {limit} monsters from D&D 5e API...")
     
     try:
         # Get list of monsters
-        response = requests.get("https://www.dnd5eapi.co/api/monsters")
-        monsters_list = response.json()['results'][:limit]
-        
-        detailed_monsters = []
+        monsters_list = asyncio.run(fetch_monster_list())[:limit]
+    except Exception as e:
+        print(f"❌ API Error: {e}")
+        return
+    
+    for start in range(0, len(monsters_list), batch_size):
+        refs = monsters_list[start:start + batch_size]
+        details = asyncio.run(fetch_monster_details(refs))
         
-        for i, monster_ref in enumerate(monsters_list, 1):
+        batch = []
+        for i, (monster_ref, monster) in enumerate(zip(refs, details), start + 1):
             print(f"⏬ {i}/{limit}: {monster_ref['name']}")
             
             try:
-                detail_response = requests.get(f"https://www.dnd5eapi.co{monster_ref['url']}")
-                monster = detail_response.json()
-                
-                # Convert to our schema
-                formatted = {
-                    'name': monster.get('name', 'Unknown'),
-                    'type': monster.get('type', 'Beast'),
-                    'size': monster.get('size', 'Medium'),
-                    'armor_class': monster.get('armor_class', [{}])[0].get('value', 10),
-                    'hit_points': monster.get('hit_points', 1),
-                    'speed': f"walk {monster.get('speed', {}).get('walk', '30 ft.')}",
-                    'challenge_rating': str(monster.get('challenge_rating', 0)),
-                    'abilities': format_abilities(monster.get('ability_scores', {})),
-                    'skills': format_skills(monster.get('proficiencies', [])),
-                    'damage_resistances': ', '.join(monster.get('damage_resistances', [])) or None,
-                    'damage_immunities': ', '.join(monster.get('damage_immunities', [])) or None,
-                    'condition_immunities': ', '.join([ci['name'] for ci in monster.get('condition_immunities', [])]) or None,
-                    'senses': format_senses(monster.get('senses', {})),
-                    'languages': ', '.join(monster.get('languages', [])) or None,
-                    'special_abilities': format_abilities_list(monster.get('special_abilities', [])),
-                    'actions': format_abilities_list(monster.get('actions', [])),
-                    'legendary_actions': format_abilities_list(monster.get('legendary_actions', [])),
-                    'source': 'D&D 5e SRD'
-                }
-                
-                detailed_monsters.append(formatted)
-                
+                if isinstance(monster, Exception):
+                    raise monster
+                batch.append(format_monster(monster))
             except Exception as e:
                 print(f"⚠️  Failed: {e}")
                 continue
         
-        return detailed_monsters
-        
-    except Exception as e:
-        print(f"❌ API Error: {e}")
-        return []
+        if batch:
+            yield batch
+
+def get_monsters_from_api(limit=20):
+    """Get monsters from D&D 5e API."""
+    return [monster for batch in iter_monster_batches(limit) for monster in batch]
+
+# Display labels for API ability score and sense keys
+ABILITY_ABBR = {
+    'strength': 'STR',
+    'dexterity': 'DEX',
+    'constitution': 'CON',
+    'intelligence': 'INT',
+    'wisdom': 'WIS',
+    'charisma': 'CHA',
+}
+
+SENSE_LABEL = {
+    'blindsight': 'Blindsight',
+    'darkvision': 'Darkvision',
+    'tremorsense': 'Tremorsense',
+    'truesight': 'Truesight',
+}
+
+SKILL_PREFIX = 'Skill: '
 
 def format_abilities(abilities):
     """Format ability scores."""
     if not abilities:
         return "STR 10 (+0), DEX 10 (+0), CON 10 (+0), INT 10 (+0), WIS 10 (+0), CHA 10 (+0)"
     
-    parts = []
-    for ability, score in abilities.items():
-        modifier = (score - 10) // 2
-        parts.append(f"{ability.upper()[:3]} {score} ({modifier:+d})")
-    return ", ".join(parts)
+    return ", ".join(
+        f"{ABILITY_ABBR.get(ability) or ability.upper()[:3]} {score} ({(score - 10) // 2:+d})"
+        for ability, score in abilities.items()
+    )
 
 def format_skills(proficiencies):
     """Format skills."""
-    skills = [p for p in proficiencies if 'Skill:' in p['proficiency']['name']]
-    if not skills:
-        return None
-    return ", ".join([f"{s['proficiency']['name'].replace('Skill: ', '')}: +{s['value']}" for s in skills])
+    proficiency_values = ((p['proficiency']['name'], p['value']) for p in proficiencies)
+    return ", ".join(
+        f"{name[len(SKILL_PREFIX):]}: +{value}"
+        for name, value in proficiency_values
+        if name.startswith(SKILL_PREFIX)
+    ) or None
 
 def format_senses(senses):
     """Format senses."""
-    parts = []
-    for sense, value in senses.items():
-        if sense != 'passive_perception':
-            parts.append(f"{sense.replace('_', ' ').title()}: {value}")
-    
-    pp = senses.get('passive_perception', 10)
-    parts.append(f"Passive Perception: {pp}")
+    parts = [
+        f"{SENSE_LABEL.get(sense) or sense.replace('_', ' ').title()}: {value}"
+        for sense, value in senses.items()
+        if sense != 'passive_perception'
+    ]
+    parts.append(f"Passive Perception: {senses.get('passive_perception', 10)}")
     return ", ".join(parts)
 
 def format_abilities_list(abilities_list):
     """Format special abilities, actions, etc."""
     if not abilities_list:
         return None
-    return "; ".join([f"{a['name']}: {a.get('desc', '')[:100]}..." for a in abilities_list])
+    return "; ".join(f"{a['name']}: {a.get('desc', '')[:100]}..." for a in abilities_list)
 
 def main():
     """Main function."""
@@ -111,28 +171,36 @@ def main():
     print("📊 Current database: ~5-8 monsters")
     print("🎯 Goal: Add 20+ more monsters")
     
-    monsters = get_monsters_from_api(20)
+    limit = 20
+    
+    # Load to BigQuery
+    response = input(f"\nDownload and load {limit} monsters to BigQuery? (y/N): ")
+    if response.lower() != 'y':
+        print("⏭️  Skipped loading")
+        return
+    
+    project_id = os.getenv("PROJECT_ID", "dandd-oracle")
+    loaded = 0
     
-    if monsters:
-        print(f"\n✅ Successfully processed {len(monsters)} monsters")
+    # Stream each fetched batch straight into BigQuery
+    for batch in iter_monster_batches(limit):
+        print(f"\n✅ Successfully processed {len(batch)} monsters")
         
         # Show sample
         print("\n📋 Sample monsters:")
-        for monster in monsters[:3]:
+        for monster in batch[:3]:
             print(f"  • {monster['name']} ({monster['type']}, CR {monster['challenge_rating']})")
         
-        # Load to BigQuery
-        response = input(f"\nLoad {len(monsters)} monsters to BigQuery? (y/N): ")
-        if response.lower() == 'y':
-            project_id = os.getenv("PROJECT_ID", "dandd-oracle")
-            try:
-                insert_monster_data(project_id, monsters)
-                print(f"🎉 Successfully added {len(monsters)} monsters!")
-                print("🔄 Restart your FastAPI server to see the new data")
-            except Exception as e:
-                print(f"❌ Failed to load: {e}")
-        else:
-            print("⏭️  Skipped loading")
+        try:
+            insert_monster_data(project_id, batch)
+            loaded += len(batch)
+        except Exception as e:
+            print(f"❌ Failed to load: {e}")
+            return
+    
+    if loaded:
+        print(f"🎉 Successfully added {loaded} monsters!")
+        print("🔄 Restart your FastAPI server to see the new data")
     else:
         print("❌ No monsters retrieved")
 
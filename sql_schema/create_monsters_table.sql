@@ -9,10 +9,11 @@ CREATE TABLE `${PROJECT_ID}.${DATASET_ID}.monsters` (
   hit_points INT64,
   speed STRING,
   challenge_rating STRING,
+  challenge_rating_num NUMERIC,
   abilities STRING,
   skills STRING,
-  damage_resistances STRING,
-  damage_immunities STRING,
+  damage_resistances ARRAY<STRING>,
+  damage_immunities ARRAY<STRING>,
   condition_immunities STRING,
   senses STRING,
   languages STRING,
@@ -21,11 +22,8 @@ CREATE TABLE `${PROJECT_ID}.${DATASET_ID}.monsters` (
   legendary_actions STRING,
   source STRING
 )
-PARTITION BY 
-  DATE(_PARTITIONTIME)
 CLUSTER BY 
-  challenge_rating, type, size
+  challenge_rating_num, type, size
 OPTIONS (
-  description = "D&D 5e Monster statistics and abilities",
-  require_partition_filter = false
+  description = "D&D 5e Monster statistics and abilities"
 ); 
\ No newline at end of file
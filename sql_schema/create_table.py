@@ -6,52 +6,89 @@ Run this to actually create the monsters table in your GCP project
 
 import json
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from google.cloud import bigquery
 
-def load_schema_from_json(schema_file: str):
-    """Load the BigQuery schema from JSON file."""
-    with open(schema_file, 'r') as f:
+@dataclass(frozen=True)
+class BQConfig:
+    """BigQuery target read once from the environment at import time."""
+    project_id: str = os.getenv("PROJECT_ID", "dandd-oracle")
+    dataset_id: str = os.getenv("DATASET_ID", "dnd_data")
+    table_id: str = os.getenv("TABLE_ID", "monsters")
+    
+    @property
+    def table_ref(self) -> str:
+        return f"{self.project_id}.{self.dataset_id}.{self.table_id}"
+
+CFG = BQConfig()
+
+# Columns stored as ARRAY<STRING> regardless of the mode in bigquery_schema.json
+REPEATED_FIELDS = {"damage_resistances", "damage_immunities"}
+
+# Columns derived at insert time that are not part of bigquery_schema.json
+DERIVED_FIELDS = [
+    bigquery.SchemaField(
+        name="challenge_rating_num",
+        field_type="NUMERIC",
+        mode="NULLABLE",
+        description="Challenge Rating as a number (e.g. '1/4' -> 0.25) for filtering and clustering"
+    ),
+]
+
+# Shared BigQuery client, created on first use
+_client = None
+
+def get_client(project_id: str) -> bigquery.Client:
+    """Return a cached BigQuery client for the project, creating it on first use."""
+    global _client
+    if _client is None or _client.project != project_id:
+        _client = bigquery.Client(project=project_id)
+    return _client
+
+@lru_cache(maxsize=4)
+def _load_schema_cached(schema_path: str, mtime: float):
+    """Parse a schema file; cached per path and modification time."""
+    with open(schema_path, 'r') as f:
         schema_json = json.load(f)
     
     # Convert JSON to BigQuery SchemaField objects
-    schema_fields = []
-    for field in schema_json:
-        schema_fields.append(
-            bigquery.SchemaField(
-                name=field["name"],
-                field_type=field["type"],
-                mode=field["mode"]
-            )
+    return tuple(
+        bigquery.SchemaField(
+            name=field["name"],
+            field_type=field["type"],
+            mode="REPEATED" if field["name"] in REPEATED_FIELDS else field["mode"]
         )
-    return schema_fields
+        for field in schema_json
+    )
+
+def load_schema_from_json(schema_file: str):
+    """Load the BigQuery schema from JSON file, re-parsing only when it changes."""
+    mtime = os.stat(schema_file).st_mtime
+    return list(_load_schema_cached(os.path.abspath(schema_file), mtime))
 
 def create_monsters_table():
     """Create the monsters table using our JSON schema."""
     
-    # Get configuration from environment
-    project_id = os.getenv("PROJECT_ID", "dandd-oracle")
-    dataset_id = os.getenv("DATASET_ID", "dnd_data") 
-    table_id = os.getenv("TABLE_ID", "monsters")
+    project_id, dataset_id, table_id = CFG.project_id, CFG.dataset_id, CFG.table_id
     
-    print(f"Creating table: {project_id}.{dataset_id}.{table_id}")
+    print(f"Creating table: {CFG.table_ref}")
     
     # Initialize BigQuery client
-    client = bigquery.Client(project=project_id)
+    client = get_client(project_id)
     
     # Load schema from our JSON file
     schema = load_schema_from_json("bigquery_schema.json")
+    schema_names = {field.name for field in schema}
+    schema += [field for field in DERIVED_FIELDS if field.name not in schema_names]
     
-    # Create dataset if it doesn't exist
+    # Create dataset if it doesn't exist (single round-trip)
     dataset_ref = bigquery.DatasetReference(project_id, dataset_id)
-    try:
-        client.get_dataset(dataset_ref)
-        print(f"✅ Dataset {dataset_id} already exists")
-    except Exception:
-        dataset = bigquery.Dataset(dataset_ref)
-        dataset.location = "US"
-        dataset.description = "D&D Monster Data"
-        client.create_dataset(dataset)
-        print(f"✅ Created dataset {dataset_id}")
+    dataset = bigquery.Dataset(dataset_ref)
+    dataset.location = "US"
+    dataset.description = "D&D Monster Data"
+    client.create_dataset(dataset, exists_ok=True)
+    print(f"✅ Dataset {dataset_id} is ready")
     
     # Create table
     table_ref = dataset_ref.table(table_id)
@@ -61,27 +98,24 @@ def create_monsters_table():
     table.description = "D&D 5e Monster statistics and abilities"
     
     # Add clustering for better performance
-    table.clustering_fields = ["challenge_rating", "type", "size"]
+    table.clustering_fields = ["challenge_rating_num", "type", "size"]
     
     try:
-        table = client.create_table(table)
-        print(f"✅ Created table {project_id}.{dataset_id}.{table_id}")
-        print(f"📊 Table has {len(table.schema)} columns")
-        
-        # Print schema for verification
-        print("\n📋 Table Schema:")
-        for field in table.schema:
-            print(f"  - {field.name}: {field.field_type} ({field.mode})")
-            
-        return table
-        
+        # Returns the existing table instead of raising if it is already there
+        table = client.create_table(table, exists_ok=True)
     except Exception as e:
-        if "already exists" in str(e).lower():
-            print(f"✅ Table {project_id}.{dataset_id}.{table_id} already exists")
-            return client.get_table(table_ref)
-        else:
-            print(f"❌ Error creating table: {e}")
-            raise e
+        print(f"❌ Error creating table: {e}")
+        raise e
+    
+    print(f"✅ Table {CFG.table_ref} is ready")
+    print(f"📊 Table has {len(table.schema)} columns")
+    
+    # Print schema for verification
+    print("\n📋 Table Schema:")
+    for field in table.schema:
+        print(f"  - {field.name}: {field.field_type} ({field.mode})")
+        
+    return table
 
 if __name__ == "__main__":
     print("🏗️  Creating BigQuery Monsters Table")
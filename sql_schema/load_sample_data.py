@@ -4,24 +4,20 @@ Load sample monster data into BigQuery table
 Run this after creating the table to test with real D&D monster data
 """
 
-import os
-import json
+import io
+import orjson
 from google.cloud import bigquery
 from sample_data import SAMPLE_MONSTERS, format_for_insert
+from create_table import CFG, get_client
 
 def load_sample_data():
     """Load sample monster data into the BigQuery table."""
     
-    # Get configuration from environment
-    project_id = os.getenv("PROJECT_ID", "dandd-oracle")
-    dataset_id = os.getenv("DATASET_ID", "dnd_data")
-    table_id = os.getenv("TABLE_ID", "monsters")
-    
-    print(f"Loading data into: {project_id}.{dataset_id}.{table_id}")
+    table_ref = CFG.table_ref
+    print(f"Loading data into: {table_ref}")
     
     # Initialize BigQuery client
-    client = bigquery.Client(project=project_id)
-    table_ref = f"{project_id}.{dataset_id}.{table_id}"
+    client = get_client(CFG.project_id)
     
     # Check if table exists
     try:
@@ -43,33 +39,43 @@ def load_sample_data():
         monster_type = monster.get('type', 'Unknown')
         print(f"  - {monster['name']} ({monster_type}, CR {cr})")
     
-    # Insert data
+    # Load data in a single batch load job
     try:
-        errors = client.insert_rows_json(table_ref, formatted_data)
+        job_config = bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            schema=table.schema,
+        )
+        
+        # Encode rows as newline-delimited JSON in one orjson pass
+        payload = io.BytesIO(b"\n".join(orjson.dumps(monster) for monster in formatted_data))
+        job = client.load_table_from_file(payload, table_ref, job_config=job_config)
         
-        if errors:
-            print(f"❌ Errors occurred during insertion:")
-            for error in errors:
+        try:
+            job.result()
+        except Exception as e:
+            print(f"❌ Errors occurred during loading:")
+            for error in job.errors or [e]:
                 print(f"  - {error}")
             return False
         else:
             print(f"\n✅ Successfully inserted {len(formatted_data)} monsters!")
             
-            # Verify the data was inserted
-            query = f"""
-            SELECT COUNT(*) as total_monsters,
-                   COUNT(DISTINCT type) as unique_types,
-                   MIN(challenge_rating) as min_cr,
-                   MAX(challenge_rating) as max_cr
-            FROM `{table_ref}`
-            """
+            # Verify the load from table metadata instead of scanning the table
+            table = client.get_table(table_ref)
+            loaded_types = {monster.get('type') for monster in formatted_data}
+            rated = sorted(
+                (monster for monster in formatted_data if monster.get('challenge_rating_num') is not None),
+                key=lambda monster: float(monster['challenge_rating_num'])
+            )
+            loaded_crs = [monster['challenge_rating'] for monster in rated]
             
-            result = client.query(query).result()
-            for row in result:
-                print(f"📈 Table now contains:")
-                print(f"   - Total monsters: {row.total_monsters}")
-                print(f"   - Unique types: {row.unique_types}")
-                print(f"   - CR range: {row.min_cr} to {row.max_cr}")
+            print(f"📈 Table now contains:")
+            print(f"   - Total monsters: {table.num_rows}")
+            print(f"📦 This load added:")
+            print(f"   - Unique types: {len(loaded_types)}")
+            if loaded_crs:
+                print(f"   - CR range: {loaded_crs[0]} to {loaded_crs[-1]}")
             
             return True
             
@@ -80,12 +86,8 @@ def load_sample_data():
 def test_queries():
     """Run some test queries to verify the data."""
     
-    project_id = os.getenv("PROJECT_ID", "dandd-oracle")
-    dataset_id = os.getenv("DATASET_ID", "dnd_data")
-    table_id = os.getenv("TABLE_ID", "monsters")
-    table_ref = f"{project_id}.{dataset_id}.{table_id}"
-    
-    client = bigquery.Client(project=project_id)
+    table_ref = CFG.table_ref
+    client = get_client(CFG.project_id)
     
     test_queries = [
         {
@@ -97,13 +99,13 @@ def test_queries():
             "sql": f"""
             SELECT name, type, challenge_rating 
             FROM `{table_ref}` 
-            WHERE SAFE_CAST(REGEXP_EXTRACT(challenge_rating, r'^(\\d+)') AS INT64) >= 10
-            ORDER BY SAFE_CAST(REGEXP_EXTRACT(challenge_rating, r'^(\\d+)') AS INT64) DESC
+            WHERE challenge_rating_num >= 10
+            ORDER BY challenge_rating_num DESC
             """
         },
         {
             "name": "Monsters with Fire Immunity",
-            "sql": f"SELECT name, damage_immunities FROM `{table_ref}` WHERE damage_immunities LIKE '%Fire%'"
+            "sql": f"SELECT name, damage_immunities FROM `{table_ref}` WHERE 'Fire' IN UNNEST(damage_immunities)"
         }
     ]
     
@@ -3,9 +3,43 @@ BigQuery schema definition for D&D Monsters table
 Provides programmatic access to create and manage the monsters table
 """
 
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import bigquery
-from typing import List, Dict, Any
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+from pydantic import (
+    BaseModel, BeforeValidator, ConfigDict, StringConstraints, TypeAdapter,
+    create_model, model_validator,
+)
+from requests.adapters import HTTPAdapter
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+import asyncio
+from typing import Annotated, List, Dict, Any, Optional, Set, Tuple
+import orjson
 import os
+import tempfile
+
+# Small inserts use the Storage Write API when google-cloud-bigquery-storage is
+# installed; set USE_STORAGE_API=false (or omit the package) to load instead
+try:
+    from google.cloud import bigquery_storage_v1
+    from google.cloud.bigquery_storage_v1 import types, writer
+except ImportError:
+    bigquery_storage_v1 = types = writer = None
+USE_STORAGE_API = (
+    bigquery_storage_v1 is not None
+    and os.getenv("USE_STORAGE_API", "true").lower() not in ("0", "false", "no")
+)
+
+# Parquet load jobs need pyarrow; without it bulk loads fall back to NDJSON
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
 # Schema definition
 MONSTERS_SCHEMA = [
@@ -16,10 +50,11 @@ MONSTERS_SCHEMA = [
     bigquery.SchemaField("hit_points", "INTEGER", mode="NULLABLE", description="The monster's hit points"),
     bigquery.SchemaField("speed", "STRING", mode="NULLABLE", description="Movement speeds (walk, fly, swim, etc.)"),
     bigquery.SchemaField("challenge_rating", "STRING", mode="NULLABLE", description="The monster's Challenge Rating (CR)"),
+    bigquery.SchemaField("challenge_rating_num", "NUMERIC", mode="NULLABLE", description="Challenge Rating as a number (e.g. '1/4' -> 0.25) for filtering and clustering"),
     bigquery.SchemaField("abilities", "STRING", mode="NULLABLE", description="All ability scores (STR, DEX, CON, INT, WIS, CHA)"),
     bigquery.SchemaField("skills", "STRING", mode="NULLABLE", description="Proficient skills and bonuses"),
-    bigquery.SchemaField("damage_resistances", "STRING", mode="NULLABLE", description="Damage types the monster resists"),
-    bigquery.SchemaField("damage_immunities", "STRING", mode="NULLABLE", description="Damage types the monster is immune to"),
+    bigquery.SchemaField("damage_resistances", "STRING", mode="REPEATED", description="Damage types the monster resists"),
+    bigquery.SchemaField("damage_immunities", "STRING", mode="REPEATED", description="Damage types the monster is immune to"),
     bigquery.SchemaField("condition_immunities", "STRING", mode="NULLABLE", description="Conditions the monster is immune to"),
     bigquery.SchemaField("senses", "STRING", mode="NULLABLE", description="Special senses (darkvision, blindsight, etc.)"),
     bigquery.SchemaField("languages", "STRING", mode="NULLABLE", description="Languages the monster can speak/understand"),
@@ -29,6 +64,100 @@ MONSTERS_SCHEMA = [
     bigquery.SchemaField("source", "STRING", mode="NULLABLE", description="Source book or material")
 ]
 
+# Target serialized payload size per Storage Write API append request
+APPEND_REQUEST_MAX_BYTES = 1_000_000
+
+# Maximum rows per append request
+INSERT_BATCH_SIZE = 500
+
+# HTTP connection pool sizes for the BigQuery REST client
+HTTP_POOL_CONNECTIONS = 32
+HTTP_POOL_MAXSIZE = 64
+
+# Unacknowledged append requests allowed by insert_monster_data_async
+INSERT_MAX_CONCURRENCY = 8
+
+# Row count at which validation is spread across worker processes
+PARALLEL_VALIDATION_MIN_ROWS = 5000
+
+# Row count at which inserts switch from the Storage Write API to a load job
+LOAD_JOB_MIN_ROWS = 1000
+
+# Protobuf field types for the BigQuery column types used in MONSTERS_SCHEMA
+PROTO_FIELD_TYPES = {
+    "STRING": descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+    "INTEGER": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+    # NUMERIC values are sent as decimal strings
+    "NUMERIC": descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+}
+
+# Datasets and tables already confirmed to exist in this process
+_DATASET_EXISTS: Set[Tuple[str, str]] = set()
+_TABLE_EXISTS: Dict[Tuple[str, str, str], bigquery.Table] = {}
+
+@lru_cache(maxsize=8)
+def _get_client(project_id: str) -> bigquery.Client:
+    """
+    Return a BigQuery client for the project, reused across calls.
+    
+    The client gets an authorized session with a larger connection pool, so
+    concurrent requests reuse open TLS connections instead of opening new ones.
+    """
+    credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=3,
+    )
+    session.mount("https://", adapter)
+    return bigquery.Client(project=project_id, credentials=credentials, _http=session)
+
+@lru_cache(maxsize=1)
+def _get_write_client() -> "bigquery_storage_v1.BigQueryWriteClient":
+    """Return the shared Storage Write API client."""
+    return bigquery_storage_v1.BigQueryWriteClient()
+
+def build_row_descriptor() -> descriptor_pb2.DescriptorProto:
+    """
+    Build the protobuf row descriptor for the Storage Write API from MONSTERS_SCHEMA.
+    
+    Returns:
+        DescriptorProto describing a single monster row
+    """
+    row_descriptor = descriptor_pb2.DescriptorProto(name="MonsterRow")
+    for number, field in enumerate(MONSTERS_SCHEMA, start=1):
+        row_descriptor.field.add(
+            name=field.name,
+            number=number,
+            type=PROTO_FIELD_TYPES[field.field_type],
+            label=(
+                descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED
+                if field.mode == "REPEATED"
+                else descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL
+            ),
+        )
+    return row_descriptor
+
+def build_row_message_class(row_descriptor: descriptor_pb2.DescriptorProto):
+    """Create a protobuf message class from the row descriptor."""
+    file_descriptor = descriptor_pb2.FileDescriptorProto(
+        name="monster_row.proto",
+        package="dnd_oracle",
+        syntax="proto2",
+    )
+    file_descriptor.message_type.add().CopyFrom(row_descriptor)
+    
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_descriptor)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName("dnd_oracle.MonsterRow"))
+
+@lru_cache(maxsize=1)
+def _row_proto() -> Tuple[descriptor_pb2.DescriptorProto, type]:
+    """Return the row descriptor and its message class, built once per process."""
+    row_descriptor = build_row_descriptor()
+    return row_descriptor, build_row_message_class(row_descriptor)
+
 def create_monsters_table(
     project_id: str,
     dataset_id: str = "dnd_data",
@@ -47,19 +176,21 @@ def create_monsters_table(
     Returns:
         Created BigQuery table object
     """
-    client = bigquery.Client(project=project_id)
+    table_key = (project_id, dataset_id, table_id)
+    if table_key in _TABLE_EXISTS:
+        return _TABLE_EXISTS[table_key]
+    
+    client = _get_client(project_id)
     
-    # Ensure dataset exists
+    # Ensure dataset exists (single round-trip)
     dataset_ref = bigquery.DatasetReference(project_id, dataset_id)
-    try:
-        client.get_dataset(dataset_ref)
-    except Exception:
-        # Create dataset if it doesn't exist
+    if (project_id, dataset_id) not in _DATASET_EXISTS:
         dataset = bigquery.Dataset(dataset_ref)
         dataset.location = location
         dataset.description = "D&D Monster Data"
-        client.create_dataset(dataset)
-        print(f"Created dataset {dataset_id}")
+        client.create_dataset(dataset, exists_ok=True)
+        print(f"Dataset {dataset_id} is ready")
+        _DATASET_EXISTS.add((project_id, dataset_id))
     
     # Create table reference
     table_ref = dataset_ref.table(table_id)
@@ -68,31 +199,26 @@ def create_monsters_table(
     # Set table properties
     table.description = "D&D 5e Monster statistics and abilities"
     
-    # Partitioning and clustering for performance
-    table.time_partitioning = bigquery.TimePartitioning(
-        type_=bigquery.TimePartitioningType.DAY,
-        field=None  # _PARTITIONTIME
-    )
-    table.clustering_fields = ["challenge_rating", "type", "size"]
+    # Clustering for performance; the reference table is too small to benefit
+    # from partitioning, so it is left unpartitioned
+    table.clustering_fields = ["challenge_rating_num", "type", "size"]
     
-    # Create the table
-    try:
-        table = client.create_table(table)
-        print(f"Created table {project_id}.{dataset_id}.{table_id}")
-        return table
-    except Exception as e:
-        if "already exists" in str(e).lower():
-            print(f"Table {project_id}.{dataset_id}.{table_id} already exists")
-            return client.get_table(table_ref)
-        else:
-            raise e
+    # Returns the existing table instead of raising if it is already there
+    table = client.create_table(table, exists_ok=True)
+    print(f"Table {project_id}.{dataset_id}.{table_id} is ready")
+    
+    _TABLE_EXISTS[table_key] = table
+    return table
 
-def get_table_schema_dict() -> List[Dict[str, Any]]:
+@lru_cache(maxsize=1)
+def get_table_schema_dict() -> Tuple[Dict[str, Any], ...]:
     """
-    Get the schema as a list of dictionaries for JSON serialization.
+    Get the schema as a sequence of dictionaries for JSON serialization.
     Useful for Terraform or other IaC tools.
+    
+    The result is built once and shared between callers; treat it as read-only.
     """
-    return [
+    return tuple(
         {
             "name": field.name,
             "type": field.field_type,
@@ -100,7 +226,87 @@ def get_table_schema_dict() -> List[Dict[str, Any]]:
             "description": field.description
         }
         for field in MONSTERS_SCHEMA
-    ]
+    )
+
+def split_list_value(value: Any) -> List[str]:
+    """
+    Normalize a repeated field value to a list of strings.
+    
+    Strings are split on ';' when present (entries may contain commas),
+    otherwise on ','. None and empty values become an empty list.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        separator = ";" if ";" in value else ","
+        return [part.strip() for part in value.split(separator) if part.strip()]
+    return [str(item) for item in value]
+
+def parse_challenge_rating(challenge_rating: Any) -> Optional[str]:
+    """
+    Convert a Challenge Rating such as '17' or '1/4' to a NUMERIC string.
+    
+    Values are rounded to NUMERIC's 9 decimal places (e.g. '1/3' ->
+    '0.333333333'). Returns None if the value is missing or cannot be parsed.
+    """
+    if challenge_rating is None or challenge_rating == "":
+        return None
+    
+    try:
+        numerator, _, denominator = str(challenge_rating).partition("/")
+        number = float(numerator) / float(denominator) if denominator else float(numerator)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return f"{number:.9f}".rstrip("0").rstrip(".")
+
+def _to_int(value: Any) -> Optional[int]:
+    """Coerce an INTEGER column value with int(); empty strings become NULL."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except TypeError as e:
+        # Pydantic only reports ValueError as a validation error
+        raise ValueError(str(e)) from e
+
+def _to_str(value: Any) -> Optional[str]:
+    """Coerce a STRING column value with str(); empty strings become NULL."""
+    if value is None or value == "":
+        return None
+    return str(value)
+
+# Pydantic field types for each BigQuery column type and mode
+_PYDANTIC_FIELD_TYPES = {
+    "STRING": Annotated[Optional[str], BeforeValidator(_to_str)],
+    "INTEGER": Annotated[Optional[int], BeforeValidator(_to_int)],
+    "NUMERIC": Annotated[Optional[str], BeforeValidator(parse_challenge_rating)],
+}
+_REPEATED_FIELD_TYPE = Annotated[List[str], BeforeValidator(split_list_value)]
+_REQUIRED_FIELD_TYPE = Annotated[str, StringConstraints(min_length=1)]
+
+def _field_definition(field: bigquery.SchemaField):
+    if field.mode == "REQUIRED":
+        return (_REQUIRED_FIELD_TYPE, ...)
+    if field.mode == "REPEATED":
+        return (_REPEATED_FIELD_TYPE, [])
+    return (_PYDANTIC_FIELD_TYPES[field.field_type], None)
+
+def _derive_challenge_rating_num(row: BaseModel) -> BaseModel:
+    # Derive the numeric CR when the caller only supplied the string form
+    if row.challenge_rating_num is None:
+        row.challenge_rating_num = parse_challenge_rating(row.challenge_rating)
+    return row
+
+# Row model generated from MONSTERS_SCHEMA and compiled once by pydantic-core
+MonsterRow = create_model(
+    "MonsterRow",
+    __config__=ConfigDict(coerce_numbers_to_str=True),
+    __validators__={
+        "derive_challenge_rating_num": model_validator(mode="after")(_derive_challenge_rating_num)
+    },
+    **{field.name: _field_definition(field) for field in MONSTERS_SCHEMA},
+)
+_MONSTER_ROWS = TypeAdapter(List[MonsterRow])
 
 def validate_monster_data(monster_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -111,65 +317,314 @@ def validate_monster_data(monster_data: Dict[str, Any]) -> Dict[str, Any]:
     
     Returns:
         Cleaned and validated monster data
+    
+    Raises:
+        ValueError: If the monster name is missing or a value cannot be
+            converted to its column type
+    """
+    return MonsterRow.model_validate(monster_data).model_dump()
+
+def validate_monsters_batch(monsters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    # Required field validation
-    if not monster_data.get("name"):
-        raise ValueError("Monster name is required")
+    Validate and clean a batch of monsters in a single pass.
     
-    # Clean and convert data types
-    cleaned_data = {}
+    The whole list is validated and dumped by pydantic-core through one
+    TypeAdapter call rather than a Python loop over rows and columns. Batches
+    of PARALLEL_VALIDATION_MIN_ROWS or more are split into one chunk per CPU
+    and validated in worker processes.
     
-    for field in MONSTERS_SCHEMA:
-        field_name = field.name
-        value = monster_data.get(field_name)
+    Args:
+        monsters: List of monster dictionaries
+    
+    Returns:
+        Cleaned and validated monster data, in input order
+    
+    Raises:
+        ValueError: If any monster name is missing or a value cannot be
+            converted to its column type
+    """
+    workers = os.cpu_count() or 1
+    if len(monsters) < PARALLEL_VALIDATION_MIN_ROWS or workers == 1:
+        return _validate_rows(monsters)
+    
+    chunk_size = -(-len(monsters) // workers)
+    chunks = [monsters[i:i + chunk_size] for i in range(0, len(monsters), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(chain.from_iterable(executor.map(_validate_rows, chunks)))
+
+def _validate_rows(monsters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate and dump rows in the current process."""
+    return _MONSTER_ROWS.dump_python(_MONSTER_ROWS.validate_python(monsters))
+
+@lru_cache(maxsize=None)
+def _arrow_schema() -> "pa.Schema":
+    """Arrow schema matching MONSTERS_SCHEMA, for Parquet load jobs."""
+    arrow_types = {
+        "STRING": pa.string(),
+        "INTEGER": pa.int64(),
+        # BigQuery NUMERIC is DECIMAL(38, 9)
+        "NUMERIC": pa.decimal128(38, 9),
+    }
+    return pa.schema([
+        pa.field(
+            field.name,
+            pa.list_(arrow_types[field.field_type]) if field.mode == "REPEATED" else arrow_types[field.field_type],
+            nullable=field.mode != "REQUIRED",
+        )
+        for field in MONSTERS_SCHEMA
+    ])
+
+def _rows_to_arrow_table(rows: List[Dict[str, Any]]) -> "pa.Table":
+    """Build an Arrow table from validated rows, column by column."""
+    schema = _arrow_schema()
+    columns = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if pa.types.is_decimal(field.type):
+            # Validated NUMERIC values are decimal strings
+            columns.append(pa.array(values, type=pa.string()).cast(field.type))
+        else:
+            columns.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+class MonsterStagingFile:
+    """
+    Temporary load-job source file that validated rows are appended to batch by
+    batch, so a large ingest never has to be held in memory at once.
+    
+    Rows are written as Parquet when pyarrow is installed and as
+    newline-delimited JSON otherwise. Use as a context manager; the file is
+    deleted on exit.
+    """
+    
+    def __init__(self):
+        self.row_count = 0
+        self._parquet = pq is not None
+        handle = tempfile.NamedTemporaryFile(
+            suffix=".parquet" if self._parquet else ".ndjson", delete=False
+        )
+        self.path = handle.name
+        if self._parquet:
+            handle.close()
+            self._writer = pq.ParquetWriter(self.path, _arrow_schema(), compression="snappy")
+        else:
+            self._writer = handle
+    
+    def __enter__(self) -> "MonsterStagingFile":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        os.unlink(self.path)
+    
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        """Append a batch of validated rows."""
+        if not rows:
+            return
+        if self._parquet:
+            self._writer.write_table(_rows_to_arrow_table(rows))
+        else:
+            self._writer.write(b"".join(orjson.dumps(row) + b"\n" for row in rows))
+        self.row_count += len(rows)
+    
+    def close(self) -> None:
+        """Finish the file; no more rows can be written."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    def load(
+        self,
+        project_id: str,
+        dataset_id: str = "dnd_data",
+        table_id: str = "monsters"
+    ) -> int:
+        """
+        Close the file and append its rows to the table with one load job.
         
-        if value is None and field.mode == "REQUIRED":
-            raise ValueError(f"Required field {field_name} is missing")
+        Returns:
+            Number of rows loaded; reporting is left to the caller
+        """
+        self.close()
+        if not self.row_count:
+            return 0
         
-        if value is not None:
-            # Type conversion based on BigQuery schema
-            if field.field_type == "INTEGER":
-                try:
-                    cleaned_data[field_name] = int(value) if value != "" else None
-                except (ValueError, TypeError):
-                    cleaned_data[field_name] = None
-            elif field.field_type == "STRING":
-                cleaned_data[field_name] = str(value) if value != "" else None
-            else:
-                cleaned_data[field_name] = value
+        client = _get_client(project_id)
+        if self._parquet:
+            parquet_options = bigquery.ParquetOptions()
+            parquet_options.enable_list_inference = True  # list columns load as REPEATED
+            job_config = bigquery.LoadJobConfig(
+                source_format=bigquery.SourceFormat.PARQUET,
+                parquet_options=parquet_options,
+                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            )
         else:
-            cleaned_data[field_name] = None
+            job_config = bigquery.LoadJobConfig(
+                schema=MONSTERS_SCHEMA,
+                source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            )
+        
+        with open(self.path, "rb") as payload:
+            job = client.load_table_from_file(
+                payload, f"{project_id}.{dataset_id}.{table_id}", job_config=job_config
+            )
+        try:
+            job.result()
+        except Exception as e:
+            raise Exception(f"Failed to load data: {job.errors or e}") from e
+        
+        return self.row_count
+
+def load_monster_rows(
+    project_id: str,
+    rows: List[Dict[str, Any]],
+    dataset_id: str = "dnd_data",
+    table_id: str = "monsters"
+) -> int:
+    """
+    Append already-validated rows with a single BigQuery load job.
+    
+    Load jobs are free and not subject to streaming quotas, which makes them
+    the cheaper path for bulk ingests. Rows are staged through a
+    MonsterStagingFile (Parquet when pyarrow is installed, NDJSON otherwise).
     
-    return cleaned_data
+    Returns:
+        Number of rows loaded
+    """
+    with MonsterStagingFile() as staging:
+        staging.write(rows)
+        return staging.load(project_id, dataset_id, table_id)
 
 def insert_monster_data(
     project_id: str,
     monsters: List[Dict[str, Any]],
     dataset_id: str = "dnd_data",
-    table_id: str = "monsters"
+    table_id: str = "monsters",
+    batch_size: int = INSERT_BATCH_SIZE,
+    max_in_flight: Optional[int] = None
 ) -> None:
     """
     Insert monster data into the BigQuery table.
     
+    Bulk inserts of LOAD_JOB_MIN_ROWS or more, and every insert when
+    USE_STORAGE_API is off, go through a single load job (see
+    load_monster_rows). Smaller inserts are written through the
+    BigQuery Storage Write API default stream, batched into append requests
+    of at most batch_size rows and roughly APPEND_REQUEST_MAX_BYTES. Requests
+    are pipelined on the one stream; failed batches are collected and
+    reported together once every request has completed.
+    
     Args:
         project_id: Google Cloud project ID
         monsters: List of monster dictionaries
         dataset_id: BigQuery dataset ID
         table_id: BigQuery table ID
+        batch_size: Maximum rows per append request
+        max_in_flight: Maximum unacknowledged append requests (None for no limit)
     """
-    client = bigquery.Client(project=project_id)
-    table_ref = f"{project_id}.{dataset_id}.{table_id}"
-    
     # Validate and clean all monster data
-    cleaned_monsters = [validate_monster_data(monster) for monster in monsters]
+    cleaned_monsters = validate_monsters_batch(monsters)
+    
+    if len(cleaned_monsters) >= LOAD_JOB_MIN_ROWS or not USE_STORAGE_API:
+        loaded = load_monster_rows(project_id, cleaned_monsters, dataset_id, table_id)
+        print(f"Successfully inserted {loaded} monsters")
+        return
+    
+    row_descriptor, row_class = _row_proto()
+    
+    write_client = _get_write_client()
+    parent = write_client.table_path(project_id, dataset_id, table_id)
+    
+    # The first request on the stream carries the stream name and writer schema
+    request_template = types.AppendRowsRequest()
+    request_template.write_stream = f"{parent}/streams/_default"
+    proto_data = types.AppendRowsRequest.ProtoData()
+    proto_data.writer_schema = types.ProtoSchema(proto_descriptor=row_descriptor)
+    request_template.proto_rows = proto_data
+    
+    append_rows_stream = writer.AppendRowsStream(write_client, request_template)
+    
+    def send(serialized_rows: List[bytes]):
+        proto_data = types.AppendRowsRequest.ProtoData()
+        proto_data.rows = types.ProtoRows(serialized_rows=serialized_rows)
+        request = types.AppendRowsRequest()
+        request.proto_rows = proto_data
+        return append_rows_stream.send(request)
+    
+    errors = []
+    pending = deque()  # (first row offset, row count, future) per unacknowledged append
     
-    # Insert data
-    errors = client.insert_rows_json(table_ref, cleaned_monsters)
+    def wait_oldest() -> None:
+        offset, row_count, future = pending.popleft()
+        try:
+            future.result()
+        except Exception as e:
+            errors.append(f"rows {offset}-{offset + row_count - 1}: {e}")
+    
+    def flush(batch: List[bytes], offset: int) -> None:
+        if max_in_flight and len(pending) >= max_in_flight:
+            wait_oldest()
+        pending.append((offset, len(batch), send(batch)))
+    
+    try:
+        offset = 0
+        batch, batch_bytes = [], 0
+        for monster in cleaned_monsters:
+            row = row_class(**{k: v for k, v in monster.items() if v is not None})
+            serialized = row.SerializeToString()
+            if batch and (
+                len(batch) >= batch_size
+                or batch_bytes + len(serialized) > APPEND_REQUEST_MAX_BYTES
+            ):
+                flush(batch, offset)
+                offset += len(batch)
+                batch, batch_bytes = [], 0
+            batch.append(serialized)
+            batch_bytes += len(serialized)
+        if batch:
+            flush(batch, offset)
+        
+        # Wait for every append to be acknowledged, collecting failures
+        while pending:
+            wait_oldest()
+    except Exception as e:
+        raise Exception(f"Failed to insert data: {e}") from e
+    finally:
+        append_rows_stream.close()
     
     if errors:
         raise Exception(f"Failed to insert data: {errors}")
-    else:
-        print(f"Successfully inserted {len(cleaned_monsters)} monsters")
+    
+    print(f"Successfully inserted {len(cleaned_monsters)} monsters")
+
+async def insert_monster_data_async(
+    project_id: str,
+    monsters: List[Dict[str, Any]],
+    dataset_id: str = "dnd_data",
+    table_id: str = "monsters",
+    batch_size: int = INSERT_BATCH_SIZE,
+    max_concurrency: int = INSERT_MAX_CONCURRENCY
+) -> None:
+    """
+    Insert monster data from async code without blocking the event loop.
+    
+    The insert runs on a worker thread through insert_monster_data, so bulk
+    inserts still become a single load job, and smaller ones share one Storage
+    Write stream with at most max_concurrency append requests in flight. Lower
+    max_concurrency if BigQuery starts returning 429/BackendError responses.
+    
+    Args:
+        project_id: Google Cloud project ID
+        monsters: List of monster dictionaries
+        dataset_id: BigQuery dataset ID
+        table_id: BigQuery table ID
+        batch_size: Maximum rows per append request
+        max_concurrency: Maximum append requests awaiting acknowledgement
+    """
+    await asyncio.to_thread(
+        insert_monster_data, project_id, monsters, dataset_id, table_id, batch_size, max_concurrency
+    )
 
 # Example usage
 if __name__ == "__main__":
@@ -5,6 +5,20 @@ Demonstrates the exact data structure and format expected
 
 from typing import List, Dict, Any
 
+from monsters_schema import parse_challenge_rating
+
+# Table columns, in schema order, for insert-ready rows
+INSERT_FIELDS = (
+    "name", "type", "size", "armor_class", "hit_points", "speed",
+    "challenge_rating", "challenge_rating_num", "abilities", "skills",
+    "damage_resistances", "damage_immunities", "condition_immunities",
+    "senses", "languages", "special_abilities", "actions",
+    "legendary_actions", "source",
+)
+
+# ARRAY<STRING> columns, inserted as [] rather than NULL
+REPEATED_INSERT_FIELDS = ("damage_resistances", "damage_immunities")
+
 # Sample monster data matching the schema
 SAMPLE_MONSTERS: List[Dict[str, Any]] = [
     {
@@ -17,8 +31,8 @@ SAMPLE_MONSTERS: List[Dict[str, Any]] = [
         "challenge_rating": "17",
         "abilities": "STR 27 (+8), DEX 10 (+0), CON 25 (+7), INT 16 (+3), WIS 13 (+1), CHA 21 (+5)",
         "skills": "Perception +13, Stealth +6",
-        "damage_resistances": None,
-        "damage_immunities": "Fire",
+        "damage_resistances": [],
+        "damage_immunities": ["Fire"],
         "condition_immunities": None,
         "senses": "Blindsight 60 ft., Darkvision 120 ft., Passive Perception 23",
         "languages": "Common, Draconic",
@@ -37,8 +51,8 @@ SAMPLE_MONSTERS: List[Dict[str, Any]] = [
         "challenge_rating": "1/4",
         "abilities": "STR 8 (-1), DEX 14 (+2), CON 10 (+0), INT 10 (+0), WIS 8 (-1), CHA 8 (-1)",
         "skills": "Stealth +6",
-        "damage_resistances": None,
-        "damage_immunities": None,
+        "damage_resistances": [],
+        "damage_immunities": [],
         "condition_immunities": None,
         "senses": "Darkvision 60 ft., Passive Perception 9",
         "languages": "Common, Goblin",
@@ -57,8 +71,8 @@ SAMPLE_MONSTERS: List[Dict[str, Any]] = [
         "challenge_rating": "13",
         "abilities": "STR 10 (+0), DEX 14 (+2), CON 18 (+4), INT 17 (+3), WIS 15 (+2), CHA 17 (+3)",
         "skills": "Perception +12",
-        "damage_resistances": None,
-        "damage_immunities": None,
+        "damage_resistances": [],
+        "damage_immunities": [],
         "condition_immunities": "Prone",
         "senses": "Darkvision 120 ft., Passive Perception 22",
         "languages": "Deep Speech, Undercommon",
@@ -77,8 +91,8 @@ SAMPLE_MONSTERS: List[Dict[str, Any]] = [
         "challenge_rating": "3",
         "abilities": "STR 20 (+5), DEX 12 (+1), CON 17 (+3), INT 3 (-4), WIS 12 (+1), CHA 7 (-2)",
         "skills": "Perception +3",
-        "damage_resistances": None,
-        "damage_immunities": None,
+        "damage_resistances": [],
+        "damage_immunities": [],
         "condition_immunities": None,
         "senses": "Darkvision 60 ft., Passive Perception 13",
         "languages": None,
@@ -97,8 +111,8 @@ SAMPLE_MONSTERS: List[Dict[str, Any]] = [
         "challenge_rating": "21",
         "abilities": "STR 11 (+0), DEX 16 (+3), CON 16 (+3), INT 20 (+5), WIS 14 (+2), CHA 16 (+3)",
         "skills": "Arcana +18, History +12, Insight +9, Perception +9",
-        "damage_resistances": "Cold, Lightning, Necrotic",
-        "damage_immunities": "Poison; Bludgeoning, Piercing, and Slashing from Nonmagical Attacks",
+        "damage_resistances": ["Cold", "Lightning", "Necrotic"],
+        "damage_immunities": ["Poison", "Bludgeoning, Piercing, and Slashing from Nonmagical Attacks"],
         "condition_immunities": "Charmed, Exhaustion, Frightened, Paralyzed, Poisoned",
         "senses": "Truesight 120 ft., Passive Perception 19",
         "languages": "Common plus up to five other languages",
@@ -118,26 +132,10 @@ def format_for_insert() -> List[Dict[str, Any]]:
     
     for monster in SAMPLE_MONSTERS:
         # Ensure all schema fields are present
-        formatted_monster = {
-            "name": monster["name"],
-            "type": monster.get("type"),
-            "size": monster.get("size"),
-            "armor_class": monster.get("armor_class"),
-            "hit_points": monster.get("hit_points"),
-            "speed": monster.get("speed"),
-            "challenge_rating": monster.get("challenge_rating"),
-            "abilities": monster.get("abilities"),
-            "skills": monster.get("skills"),
-            "damage_resistances": monster.get("damage_resistances"),
-            "damage_immunities": monster.get("damage_immunities"),
-            "condition_immunities": monster.get("condition_immunities"),
-            "senses": monster.get("senses"),
-            "languages": monster.get("languages"),
-            "special_abilities": monster.get("special_abilities"),
-            "actions": monster.get("actions"),
-            "legendary_actions": monster.get("legendary_actions"),
-            "source": monster.get("source")
-        }
+        formatted_monster = {field: monster.get(field) for field in INSERT_FIELDS}
+        formatted_monster["challenge_rating_num"] = parse_challenge_rating(monster.get("challenge_rating"))
+        for field in REPEATED_INSERT_FIELDS:
+            formatted_monster[field] = formatted_monster[field] or []
         formatted_monsters.append(formatted_monster)
     
     return formatted_monsters
@@ -153,13 +151,13 @@ EXAMPLE_QUERIES = [
         "sql": """
         SELECT name, type, challenge_rating, armor_class 
         FROM `{project}.{dataset}.monsters` 
-        WHERE SAFE_CAST(REGEXP_EXTRACT(challenge_rating, r'^(\d+)') AS INT64) >= 10
-        ORDER BY SAFE_CAST(REGEXP_EXTRACT(challenge_rating, r'^(\d+)') AS INT64) DESC
+        WHERE challenge_rating_num >= 10
+        ORDER BY challenge_rating_num DESC
         """
     },
     {
         "description": "Monsters with fire immunity",
-        "sql": "SELECT name, type, damage_immunities FROM `{project}.{dataset}.monsters` WHERE damage_immunities LIKE '%Fire%'"
+        "sql": "SELECT name, type, damage_immunities FROM `{project}.{dataset}.monsters` WHERE 'Fire' IN UNNEST(damage_immunities)"
     },
     {
         "description": "Large or larger monsters",
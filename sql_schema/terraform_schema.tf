@@ -52,6 +52,12 @@ resource "google_bigquery_table" "monsters_table_updated" {
       mode = "NULLABLE"
       description = "The monster's Challenge Rating (CR as string)"
     },
+    {
+      name = "challenge_rating_num"
+      type = "NUMERIC"
+      mode = "NULLABLE"
+      description = "Challenge Rating as a number (e.g. '1/4' -> 0.25) for filtering and clustering"
+    },
     {
       name = "abilities"
       type = "STRING"
@@ -67,13 +73,13 @@ resource "google_bigquery_table" "monsters_table_updated" {
     {
       name = "damage_resistances"
       type = "STRING"
-      mode = "NULLABLE"
+      mode = "REPEATED"
       description = "Damage types the monster resists"
     },
     {
       name = "damage_immunities"
       type = "STRING"
-      mode = "NULLABLE"
+      mode = "REPEATED"
       description = "Damage types the monster is immune to"
     },
     {
@@ -120,13 +126,8 @@ resource "google_bigquery_table" "monsters_table_updated" {
     }
   ])
 
-  # Performance optimizations
-  time_partitioning {
-    type  = "DAY"
-    field = null  # Uses _PARTITIONTIME
-  }
-
-  clustering = ["challenge_rating", "type", "size"]
+  # Performance optimizations (small reference table: clustered, not partitioned)
+  clustering = ["challenge_rating_num", "type", "size"]
 
   # Deletion protection for production
   deletion_protection = true
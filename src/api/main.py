@@ -5,37 +5,65 @@ This module implements the high-performance, async API server that exposes
 the hybrid RAG functionality through RESTful endpoints.
 """
 
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
 import time
 import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any
 from dotenv import load_dotenv
 
-# Load environment variables from .env file - try multiple locations
-# First try from project root (when running from src/)
-env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
-if not os.path.exists(env_path):
-    # Try from current directory (when running from project root)
-    env_path = '.env'
-
-load_dotenv(env_path)
+# Load environment variables from .env file - try multiple locations.
+# Production deploys (Cloud Run) inject env vars directly, so skip the file
+# lookup there; variables already exported are never overridden.
+if os.getenv("ENVIRONMENT") != "production":
+    # First try from project root (when running from src/)
+    env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
+    if not os.path.exists(env_path):
+        # Try from current directory (when running from project root)
+        env_path = '.env'
+    
+    load_dotenv(env_path, override=False)
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import orjson
 import uvicorn
+from pydantic import BaseModel
 
 from .models import (
     QueryRequest, QueryResponse,
     NarrateRequest, NarrateResponse,
-    HealthResponse
+    HealthResponse, RootResponse
 )
 
 # Import the RAG engine
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from rag_engine import HybridRAGEngine
+from rag_engine import HybridRAGEngine, bigquery_pool_stats
+
+# Single stream handler for the service, level from LOG_LEVEL. Records are
+# queued by the request coroutines and written to stderr by a listener thread,
+# so logging never blocks the event loop on a stream write.
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+)
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # full format applied by the listener
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[_log_queue_handler]
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logger = logging.getLogger(__name__)
 
 # Configuration from environment variables
 PROJECT_ID = os.getenv("PROJECT_ID", "your-project-id")
@@ -43,8 +71,41 @@ DATASET_ID = os.getenv("DATASET_ID", "dnd_data")
 TABLE_ID = os.getenv("TABLE_ID", "monsters")
 DATA_BUCKET = os.getenv("DATA_BUCKET", "your-data-bucket")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+# Optional Infinity embedding server; Gemini embeddings are used when unset
+EMBEDDING_API_URL = os.getenv("EMBEDDING_API_URL")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 APP_VERSION = os.getenv("APP_VERSION", "1.0.0")
+# Load the router's semantic cache model in the background at startup; until
+# it is loaded (or when this is off) only exact-match routing caches are used
+SEMANTIC_ROUTE_CACHE = os.getenv("SEMANTIC_ROUTE_CACHE", "true").lower() in ("1", "true", "yes")
+# Pre-classify COMMON_DND_QUERIES at startup; off by default since it costs a
+# batch Gemini call on every cold start
+ROUTER_WARMUP = os.getenv("ROUTER_WARMUP", "false").lower() in ("1", "true", "yes")
+# Comma-separated list of allowed browser origins, parsed once at startup
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+    if origin.strip()
+]
+
+# Static response bodies, built once at import
+_ROOT_PAYLOAD = RootResponse(
+    service="Dungeon Master's Oracle",
+    version=APP_VERSION,
+    description="A hybrid RAG system for D&D Dungeon Masters",
+    environment=ENVIRONMENT,
+    endpoints={
+        "query": "/query - Ask questions about D&D rules, lore, and monsters",
+        "narrate": "/narrate - Generate creative D&D narrative content",
+        "health": "/health - Service health check",
+        "docs": "/docs - Interactive API documentation"
+    },
+    status="operational"
+)
+_HEALTHY_COMPONENTS = {
+    "rag_engine": {"status": "healthy"},
+    "environment": ENVIRONMENT
+}
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -59,8 +120,9 @@ app = FastAPI(
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    # Credentials cannot be combined with a wildcard origin
+    allow_credentials="*" not in CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -82,6 +144,29 @@ async def get_rag_engine() -> HybridRAGEngine:
     return rag_engine
 
 
+async def _prepare_router(router) -> None:
+    """Load the semantic cache model, then pre-classify common questions, as configured."""
+    if SEMANTIC_ROUTE_CACHE:
+        await router.load_embedder()
+    if ROUTER_WARMUP:
+        await router.warmup()
+
+
+def _log_router_setup_result(task: asyncio.Task) -> None:
+    """Report the outcome of the background router setup."""
+    if task.cancelled():
+        logger.warning("Router setup was cancelled")
+    elif task.exception() is not None:
+        logger.error("Router setup failed: %s", task.exception())
+    else:
+        logger.info("Router setup finished")
+
+
+def _json_response(model: BaseModel) -> Response:
+    """Serialize an already validated response model straight to JSON."""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
 @app.on_event("startup")
 async def startup_event():
     """
@@ -91,7 +176,7 @@ async def startup_event():
     global rag_engine
     
     try:
-        print("Initializing Dungeon Master's Oracle...")
+        logger.info("Initializing Dungeon Master's Oracle")
         
         # Validate required environment variables
         if not GOOGLE_API_KEY:
@@ -103,14 +188,23 @@ async def startup_event():
             dataset_id=DATASET_ID,
             table_id=TABLE_ID,
             data_bucket=DATA_BUCKET,
-            api_key=GOOGLE_API_KEY
+            api_key=GOOGLE_API_KEY,
+            embedding_api_url=EMBEDDING_API_URL
         )
         
-        print("✅ RAG engine initialized successfully")
-        print(f"🌟 Dungeon Master's Oracle is ready! (Environment: {ENVIRONMENT})")
+        logger.info("RAG engine initialized successfully")
+        
+        # Load the semantic cache model and pre-classify common questions in
+        # the background so startup is not blocked; requests served before it
+        # finishes use the other caches. The task is kept on app.state since
+        # the loop only holds it weakly
+        if SEMANTIC_ROUTE_CACHE or ROUTER_WARMUP:
+            app.state.router_setup_task = asyncio.create_task(_prepare_router(rag_engine.router))
+            app.state.router_setup_task.add_done_callback(_log_router_setup_result)
+        logger.info("Dungeon Master's Oracle is ready (environment: %s)", ENVIRONMENT)
         
     except Exception as e:
-        print(f"❌ Failed to initialize RAG engine: {e}")
+        logger.error("Failed to initialize RAG engine: %s", e)
         # In production, you might want to exit here
         # For development, we'll continue and handle errors in endpoints
 
@@ -120,7 +214,7 @@ async def shutdown_event():
     """
     Cleanup tasks when the application shuts down.
     """
-    print("🛑 Shutting down Dungeon Master's Oracle...")
+    logger.info("Shutting down Dungeon Master's Oracle")
     # Add any cleanup logic here (close database connections, etc.)
 
 
@@ -131,9 +225,9 @@ async def health_check():
     
     Returns the overall health status of the service and its components.
     """
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    
     try:
-        timestamp = datetime.utcnow().isoformat() + "Z"
-        
         # Basic health check
         if rag_engine is None:
             return HealthResponse(
@@ -150,26 +244,32 @@ async def health_check():
             status="healthy",
             timestamp=timestamp,
             version=APP_VERSION,
-            components={
-                "rag_engine": {"status": "healthy"},
-                "environment": ENVIRONMENT
-            }
+            components=_HEALTHY_COMPONENTS
         )
         
     except Exception as e:
         return HealthResponse(
             status="unhealthy",
-            timestamp=datetime.utcnow().isoformat() + "Z",
+            timestamp=timestamp,
             version=APP_VERSION,
             components={"error": str(e)}
         )
 
 
+@app.get("/debug/pool", include_in_schema=False)
+async def debug_pool():
+    """
+    BigQuery query pool metrics: concurrency limit, in-flight and queued
+    queries, and p95 latency of recent queries.
+    """
+    return bigquery_pool_stats()
+
+
 @app.post("/query", response_model=QueryResponse)
 async def query_oracle(
     request: QueryRequest,
     engine: HybridRAGEngine = Depends(get_rag_engine)
-) -> QueryResponse:
+) -> Response:
     """
     Main query endpoint for the Dungeon Master's Oracle.
     
@@ -196,17 +296,20 @@ async def query_oracle(
             session_id=request.session_id
         )
         
-        # Add processing time to metadata
+        # Add processing time to metadata (copied, since cached answers share it)
         processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-        if result.get("metadata"):
-            result["metadata"]["processing_time_ms"] = round(processing_time, 2)
-        else:
-            result["metadata"] = {"processing_time_ms": round(processing_time, 2)}
+        result["metadata"] = {
+            **(result.get("metadata") or {}),
+            "processing_time_ms": round(processing_time, 2)
+        }
         
-        return QueryResponse(**result)
+        # Validated once here and serialized by pydantic-core; returning a
+        # Response skips FastAPI's second validation against response_model,
+        # which is kept for the OpenAPI docs
+        return _json_response(QueryResponse(**result))
         
     except Exception as e:
-        print(f"Error in query endpoint: {e}")
+        logger.error("Error in query endpoint: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while processing your query: {str(e)}"
@@ -217,7 +320,7 @@ async def query_oracle(
 async def generate_narrative(
     request: NarrateRequest,
     engine: HybridRAGEngine = Depends(get_rag_engine)
-) -> NarrateResponse:
+) -> Response:
     """
     Creative narrative generation endpoint for D&D storytelling.
     
@@ -242,34 +345,65 @@ async def generate_narrative(
             style=request.style.value
         )
         
-        return NarrateResponse(**result)
+        # Validated once, serialized without FastAPI's response_model pass
+        return _json_response(NarrateResponse(**result))
         
     except Exception as e:
-        print(f"Error in narrate endpoint: {e}")
+        logger.error("Error in narrate endpoint: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while generating narrative: {str(e)}"
         )
 
 
-@app.get("/")
+async def _sse_events(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode engine events as Server-Sent Events, ending with a done event."""
+    async for event in events:
+        yield b"data: " + orjson.dumps(event) + b"\n\n"
+    yield b'data: {"done": true}\n\n'
+
+
+@app.post("/query/stream")
+async def query_oracle_stream(
+    request: QueryRequest,
+    engine: HybridRAGEngine = Depends(get_rag_engine)
+) -> StreamingResponse:
+    """
+    Streaming variant of /query, sent as Server-Sent Events.
+    
+    The first event carries the route, sources and retrieval status; each
+    following event carries the next chunk of answer text (`{"text": ...}`).
+    The stream ends with `{"done": true}`; failures arrive as `{"error": ...}`.
+    """
+    return StreamingResponse(
+        _sse_events(engine.query_stream(request.query)),
+        media_type="text/event-stream"
+    )
+
+
+@app.post("/narrate/stream")
+async def generate_narrative_stream(
+    request: NarrateRequest,
+    engine: HybridRAGEngine = Depends(get_rag_engine)
+) -> StreamingResponse:
+    """
+    Streaming variant of /narrate, sent as Server-Sent Events.
+    
+    Each event carries the next chunk of narrative text (`{"text": ...}`).
+    The stream ends with `{"done": true}`; failures arrive as `{"error": ...}`.
+    """
+    return StreamingResponse(
+        _sse_events(engine.narrate_stream(prompt=request.prompt, style=request.style.value)),
+        media_type="text/event-stream"
+    )
+
+
+@app.get("/", response_model=RootResponse)
 async def root():
     """
     Root endpoint providing basic information about the API.
     """
-    return {
-        "service": "Dungeon Master's Oracle",
-        "version": APP_VERSION,
-        "description": "A hybrid RAG system for D&D Dungeon Masters",
-        "environment": ENVIRONMENT,
-        "endpoints": {
-            "query": "/query - Ask questions about D&D rules, lore, and monsters",
-            "narrate": "/narrate - Generate creative D&D narrative content", 
-            "health": "/health - Service health check",
-            "docs": "/docs - Interactive API documentation"
-        },
-        "status": "operational"
-    }
+    return _ROOT_PAYLOAD
 
 
 # Custom exception handlers
@@ -289,7 +423,7 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Custom handler for general exceptions."""
-    print(f"Unhandled exception: {exc}")
+    logger.exception("Unhandled exception: %s", exc)
     return JSONResponse(
         status_code=500,
         content={
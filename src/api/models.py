@@ -63,4 +63,14 @@ class HealthResponse(BaseModel):
     status: str = Field(..., description="Overall health status")
     timestamp: str = Field(..., description="Health check timestamp")
     version: Optional[str] = Field(default=None, description="App version")
-    components: Optional[Dict[str, Any]] = Field(default=None, description="Component health")
\ No newline at end of file
+    components: Optional[Dict[str, Any]] = Field(default=None, description="Component health")
+
+
+class RootResponse(BaseModel):
+    """Response model for the root endpoint."""
+    service: str = Field(..., description="Service name")
+    version: str = Field(..., description="App version")
+    description: str = Field(..., description="Service description")
+    environment: str = Field(..., description="Deployment environment")
+    endpoints: Dict[str, str] = Field(..., description="Available endpoints")
+    status: str = Field(..., description="Service status")
@@ -1,6 +1,7 @@
 """RAG Engine Module for DM Oracle."""
 
 from .hybrid_rag import HybridRAGEngine
-from .router import QueryRouter
+from .retrievers import bigquery_pool_stats
+from .router import COMMON_DND_QUERIES, QueryRouter
 
-__all__ = ["HybridRAGEngine", "QueryRouter"]
\ No newline at end of file
+__all__ = ["HybridRAGEngine", "QueryRouter", "COMMON_DND_QUERIES", "bigquery_pool_stats"]
\ No newline at end of file
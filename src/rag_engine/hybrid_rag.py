@@ -1,12 +1,22 @@
 """Hybrid RAG Engine for the Dungeon Master's Oracle."""
 
-from typing import Dict, Any, Optional
+import asyncio
+import io
+import logging
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
 from langchain.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from .router import QueryRouter
+from .router import QueryRouter, keyword_route
 from .retrievers import StructuredRetriever, UnstructuredRetriever
 
+logger = logging.getLogger(__name__)
+
+# Answers kept for repeated questions, and how long each stays valid
+ANSWER_CACHE_MAX_SIZE = 512
+ANSWER_CACHE_TTL_SECONDS = 60 * 60
+
 
 class HybridRAGEngine:
     """Main orchestrator for the hybrid RAG system."""
@@ -18,7 +28,8 @@ class HybridRAGEngine:
         table_id: str,
         data_bucket: str,
         api_key: str,
-        model_name: str = "gemini-1.5-flash"
+        model_name: str = "gemini-1.5-flash",
+        embedding_api_url: Optional[str] = None
     ):
         self.project_id = project_id
         self.dataset_id = dataset_id
@@ -27,21 +38,25 @@ class HybridRAGEngine:
         self.api_key = api_key
         
         # Initialize components
-        self.router = QueryRouter(api_key, model_name)
+        self.router = QueryRouter(api_key)
         self.structured_retriever = StructuredRetriever(
             project_id, dataset_id, table_id, api_key
         )
         self.unstructured_retriever = UnstructuredRetriever(
-            data_bucket, api_key, project_id
+            data_bucket, api_key, project_id, embedding_api_url
         )
         
-        # Response generator
+        # Response generator (Gemini SDK imported lazily to keep module import cheap)
+        from langchain_google_genai import ChatGoogleGenerativeAI
         self.response_llm = ChatGoogleGenerativeAI(
             model=model_name,
             google_api_key=api_key,
             temperature=0.7,
         )
         
+        # Answers (or in-flight answer tasks) keyed on the normalized question
+        self._answer_cache: "OrderedDict[str, Tuple[float, asyncio.Task]]" = OrderedDict()
+        
         # Response prompts
         self.structured_response_prompt = ChatPromptTemplate.from_template(
             """You are a helpful Dungeon Master assistant with access to D&D monster data.
@@ -64,28 +79,103 @@ Relevant D&D information:
 
 Provide a comprehensive and engaging answer:"""
         )
+        
+        self.narrative_prompt = ChatPromptTemplate.from_template(
+            """You are a master Dungeon Master and expert storyteller.
+Your tone is {style}, engaging, and immersive.
+
+Create narrative content for: "{prompt}"
+
+Use vivid descriptions and sensory details. Keep it suitable for D&D games.
+
+Narrative:"""
+        )
+        
+        # Response chains, composed once and reused for every request
+        self.structured_chain = self.structured_response_prompt | self.response_llm
+        self.unstructured_chain = self.unstructured_response_prompt | self.response_llm
+        self.narrative_chain = self.narrative_prompt | self.response_llm
     
     async def query(self, question: str, session_id: Optional[str] = None) -> Dict[str, Any]:
-        """Process a user query through the hybrid RAG pipeline."""
+        """
+        Process a user query through the hybrid RAG pipeline.
+        
+        Answers whose retrieval and generation both succeeded are cached per
+        normalized question for ANSWER_CACHE_TTL_SECONDS, and concurrent
+        identical questions share a single pipeline run.
+        """
+        key = " ".join(question.lower().split())
+        now = time.monotonic()
+        
+        cached = self._answer_cache.get(key)
+        if cached is not None and now - cached[0] < ANSWER_CACHE_TTL_SECONDS:
+            self._answer_cache.move_to_end(key)
+            answer_task = cached[1]
+        else:
+            answer_task = asyncio.create_task(self._answer(question))
+            self._answer_cache[key] = (now, answer_task)
+            if len(self._answer_cache) > ANSWER_CACHE_MAX_SIZE:
+                self._answer_cache.popitem(last=False)
+            answer_task.add_done_callback(lambda task: self._evict_failed_answer(key, task))
+        
+        # Shielded so one caller disconnecting does not cancel the shared run
+        result = await asyncio.shield(answer_task)
+        return {**result, "session_id": session_id}
+    
+    def _evict_failed_answer(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished answer task from the cache unless retrieval and generation both succeeded."""
+        if (
+            task.cancelled()
+            or task.exception() is not None
+            or not task.result().get("retrieval_success")
+            or not task.result().get("generation_success")
+        ):
+            cached = self._answer_cache.get(key)
+            if cached is not None and cached[1] is task:
+                del self._answer_cache[key]
+    
+    async def _route_and_retrieve(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        """Route a question and run the matching retriever."""
+        # Unstructured retrieval is read-only, so it starts speculatively while
+        # the query is being routed and is cancelled if the route is structured.
+        # It costs a rewrite LLM call and an embedding batch, so it is skipped
+        # when keyword signals already make the question structured
+        speculative_retrieval = None
+        if keyword_route(" ".join(question.lower().split())) != "structured":
+            speculative_retrieval = asyncio.create_task(self.unstructured_retriever.retrieve(question))
         try:
             # Route the query
             route = await self.router.route_query(question)
-            print(f"Query routed to: {route}")
+            logger.debug("Query routed to: %s", route)
             
             # Retrieve information
             if route == "structured":
-                retrieval_result = await self.structured_retriever.retrieve(question)
-                response = await self._generate_structured_response(question, retrieval_result)
+                if speculative_retrieval is not None:
+                    speculative_retrieval.cancel()
+                return route, await self.structured_retriever.retrieve(question)
+            if speculative_retrieval is None:
+                return route, await self.unstructured_retriever.retrieve(question)
+            return route, await speculative_retrieval
+        except BaseException:
+            if speculative_retrieval is not None:
+                speculative_retrieval.cancel()
+            raise
+    
+    async def _answer(self, question: str) -> Dict[str, Any]:
+        """Route, retrieve and generate the answer to a question."""
+        try:
+            route, retrieval_result = await self._route_and_retrieve(question)
+            if route == "structured":
+                response, generated = await self._generate_structured_response(question, retrieval_result)
             else:
-                retrieval_result = await self.unstructured_retriever.retrieve(question)
-                response = await self._generate_unstructured_response(question, retrieval_result)
+                response, generated = await self._generate_unstructured_response(question, retrieval_result)
             
             return {
                 "answer": response,
                 "route": route,
                 "sources": self._extract_sources(retrieval_result),
                 "retrieval_success": retrieval_result.get("success", False),
-                "session_id": session_id,
+                "generation_success": generated,
                 "metadata": {
                     "query_type": route,
                     "retrieval_metadata": retrieval_result
@@ -93,86 +183,111 @@ Provide a comprehensive and engaging answer:"""
             }
             
         except Exception as e:
-            print(f"Error in hybrid RAG query: {e}")
+            logger.error("Error in hybrid RAG query: %s", e)
             return {
                 "answer": f"I encountered an error: {str(e)}. Please try rephrasing your question.",
                 "route": "error",
                 "sources": [],
                 "retrieval_success": False,
-                "session_id": session_id,
+                "generation_success": False,
                 "error": str(e)
             }
     
-    async def _generate_structured_response(self, question: str, retrieval_result: Dict[str, Any]) -> str:
-        """Generate response for structured data."""
+    async def query_stream(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user query, streaming the answer as it is generated.
+        
+        Yields one event with the routing decision and sources once retrieval
+        finishes, then events carrying successive chunks of answer text.
+        Failures are reported as a final event with an "error" key.
+        """
         try:
-            if not retrieval_result.get("success"):
-                return f"Database error: {retrieval_result.get('result', 'Unknown error')}"
+            route, retrieval_result = await self._route_and_retrieve(question)
+            success = retrieval_result.get("success", False)
+            yield {
+                "route": route,
+                "sources": self._extract_sources(retrieval_result),
+                "retrieval_success": success
+            }
             
-            chain = self.structured_response_prompt | self.response_llm
-            result = await chain.ainvoke({
-                "question": question,
-                "retrieved_data": retrieval_result.get("result", "No data found")
-            })
-            return result.content.strip()
+            if route == "structured":
+                if not success:
+                    yield {"text": f"Database error: {retrieval_result.get('result', 'Unknown error')}"}
+                    return
+                chain, inputs = self.structured_chain, self._structured_inputs(question, retrieval_result)
+            else:
+                if not success:
+                    yield {"text": f"Knowledge base error: {retrieval_result.get('error', 'Unknown error')}"}
+                    return
+                chain, inputs = self.unstructured_chain, self._unstructured_inputs(question, retrieval_result)
             
+            async for chunk in chain.astream(inputs):
+                yield {"text": chunk.content}
+                
         except Exception as e:
-            return f"Error generating response: {str(e)}"
+            logger.error("Error in streamed hybrid RAG query: %s", e)
+            yield {"error": str(e)}
+    
+    def _structured_inputs(self, question: str, retrieval_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Prompt variables for the structured response chain."""
+        return {
+            "question": question,
+            "retrieved_data": retrieval_result.get("result", "No data found")
+        }
+    
+    def _unstructured_inputs(self, question: str, retrieval_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Prompt variables for the unstructured response chain."""
+        # Rendered into one buffer rather than per-document strings + join
+        documents = retrieval_result.get("documents", [])
+        buffer = io.StringIO()
+        for index, doc in enumerate(documents):
+            if index:
+                buffer.write("\n\n")
+            buffer.write("Source: ")
+            buffer.write(doc.get("source", "Unknown"))
+            buffer.write("\nContent: ")
+            buffer.write(doc.get("content", ""))
+        doc_text = buffer.getvalue()
+        
+        return {
+            "question": question,
+            "retrieved_documents": doc_text or "No relevant information found."
+        }
     
-    async def _generate_unstructured_response(self, question: str, retrieval_result: Dict[str, Any]) -> str:
-        """Generate response for unstructured data."""
+    async def _generate_structured_response(self, question: str, retrieval_result: Dict[str, Any]) -> Tuple[str, bool]:
+        """Generate response for structured data, returning (answer, whether generation succeeded)."""
         try:
             if not retrieval_result.get("success"):
-                return f"Knowledge base error: {retrieval_result.get('error', 'Unknown error')}"
+                return f"Database error: {retrieval_result.get('result', 'Unknown error')}", False
             
-            documents = retrieval_result.get("documents", [])
-            doc_text = "\n\n".join([
-                f"Source: {doc.get('source', 'Unknown')}\nContent: {doc.get('content', '')}"
-                for doc in documents
-            ])
+            result = await self.structured_chain.ainvoke(self._structured_inputs(question, retrieval_result))
+            return result.content.strip(), True
             
-            chain = self.unstructured_response_prompt | self.response_llm
-            result = await chain.ainvoke({
-                "question": question,
-                "retrieved_documents": doc_text or "No relevant information found."
-            })
-            return result.content.strip()
+        except Exception as e:
+            logger.error("Error generating structured response: %s", e)
+            return f"Error generating response: {str(e)}", False
+    
+    async def _generate_unstructured_response(self, question: str, retrieval_result: Dict[str, Any]) -> Tuple[str, bool]:
+        """Generate response for unstructured data, returning (answer, whether generation succeeded)."""
+        try:
+            if not retrieval_result.get("success"):
+                return f"Knowledge base error: {retrieval_result.get('error', 'Unknown error')}", False
+            
+            result = await self.unstructured_chain.ainvoke(self._unstructured_inputs(question, retrieval_result))
+            return result.content.strip(), True
             
         except Exception as e:
-            return f"Error generating response: {str(e)}"
+            logger.error("Error generating unstructured response: %s", e)
+            return f"Error generating response: {str(e)}", False
     
     def _extract_sources(self, retrieval_result: Dict[str, Any]) -> list:
-        """Extract sources from retrieval results."""
-        sources = []
-        
-        if retrieval_result.get("type") == "structured":
-            if retrieval_result.get("success"):
-                sources.append("D&D Monster Database")
-        elif retrieval_result.get("type") == "unstructured":
-            documents = retrieval_result.get("documents", [])
-            for doc in documents:
-                source = doc.get("source", "D&D SRD")
-                if source not in sources:
-                    sources.append(source)
-        
-        return sources
+        """Extract sources from retrieval results (collected by the retriever)."""
+        return retrieval_result.get("sources", [])
     
     async def narrate(self, prompt: str, style: str = "descriptive") -> Dict[str, Any]:
         """Generate creative narrative content."""
         try:
-            narrative_prompt = ChatPromptTemplate.from_template(
-                """You are a master Dungeon Master and expert storyteller.
-Your tone is {style}, engaging, and immersive.
-
-Create narrative content for: "{prompt}"
-
-Use vivid descriptions and sensory details. Keep it suitable for D&D games.
-
-Narrative:"""
-            )
-            
-            chain = narrative_prompt | self.response_llm
-            result = await chain.ainvoke({
+            result = await self.narrative_chain.ainvoke({
                 "prompt": prompt,
                 "style": style
             })
@@ -189,4 +304,20 @@ Narrative:"""
                 "style": style,
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+    
+    async def narrate_stream(self, prompt: str, style: str = "descriptive") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate creative narrative content, streaming it as it is generated.
+        
+        Yields events carrying successive chunks of narrative text, or a final
+        event with an "error" key if generation fails.
+        """
+        try:
+            async for chunk in self.narrative_chain.astream({
+                "prompt": prompt,
+                "style": style
+            }):
+                yield {"text": chunk.content}
+        except Exception as e:
+            yield {"error": f"Error creating narrative: {str(e)}"}
\ No newline at end of file
@@ -1,10 +1,273 @@
 """Retriever Components for Hybrid RAG System."""
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import functools
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from google.api_core.exceptions import DeadlineExceeded, ServiceUnavailable
 from langchain.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.utilities import SQLDatabase
-from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+from langchain.schema import SystemMessage
+from pydantic import BaseModel, Field
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+# Generated SQL is checked locally when sqlglot is installed, so malformed or
+# non-SELECT statements are retried without a BigQuery round trip
+try:
+    import sqlglot
+    from sqlglot import exp
+except ImportError:
+    sqlglot = exp = None
+
+logger = logging.getLogger(__name__)
+
+if sqlglot is None:
+    logger.warning(
+        "sqlglot is not installed: generated SQL will not be checked before it runs, "
+        "and non-SELECT statements are not rejected (pip install sqlglot)"
+    )
+
+# Concurrent BigQuery queries per StructuredRetriever; the SQL tool is
+# synchronous, so each in-flight query occupies one worker thread
+SQL_MAX_WORKERS = 8
+
+# Concurrent BigQuery queries across all retrievers, kept under the project's
+# concurrent-query quota; excess queries wait instead of failing with 429s
+BQ_MAX_CONCURRENCY = int(os.getenv("BQ_MAX_CONCURRENCY", "8"))
+# Recent query latencies kept for pool metrics
+POOL_LATENCY_WINDOW = 256
+
+# Generated SQL is reused per normalized question; query results are reused
+# per SQL statement for a shorter time, since the table can change
+SQL_CACHE_MAX_SIZE = 1024
+SQL_CACHE_TTL_SECONDS = 60 * 60
+SQL_RESULT_CACHE_TTL_SECONDS = 5 * 60
+# Questions whose SQL could not be corrected fail fast for a short while
+# instead of repeating every attempt
+SQL_FAILURE_CACHE_TTL_SECONDS = 5 * 60
+
+# Per-query scan cap for generated SQL; a runaway query fails fast instead of
+# billing a full scan. Identical SQL is served from BigQuery's result cache
+BIGQUERY_MAX_BYTES_BILLED = 1 << 30
+# Row limit added to generated SELECTs that have none
+SQL_DEFAULT_LIMIT = 100
+
+# Transient Gemini failures are retried with jittered exponential backoff;
+# bad SQL goes through the self-correction loop in retrieve() instead
+_TRANSIENT_ERRORS = (ServiceUnavailable, DeadlineExceeded, TimeoutError)
+_transient_retry = retry(
+    retry=retry_if_exception_type(_TRANSIENT_ERRORS),
+    wait=wait_random_exponential(min=0.2, max=4),
+    stop=stop_after_attempt(3),
+    reraise=True
+)
+
+# Persisted IVF vector index in the data bucket, cached locally (in
+# VECTOR_INDEX_DIR) until a new generation is published; nprobe trades recall
+# for latency at query time
+VECTOR_INDEX_BLOB = "vector_store/dnd_rules.ivf.faiss"
+VECTOR_DOCSTORE_BLOB = "vector_store/dnd_rules.documents.json"
+VECTOR_INDEX_DIR = Path(
+    os.getenv("VECTOR_INDEX_DIR", "~/.dnd_oracle/vector_index")
+).expanduser().resolve()
+VECTOR_EMBEDDING_MODEL = "models/embedding-001"
+# Model served by an Infinity embedding server, when one is configured
+INFINITY_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+# Texts per embedding request when embedding a corpus offline
+EMBED_BATCH_SIZE = 64
+VECTOR_NPROBE = 16
+# Product quantization for large corpora (see build_ivfpq_index): vectors are
+# stored as m one-byte codes, and training uses at most a fixed-size sample
+VECTOR_PQ_NLIST = 4096
+VECTOR_PQ_SUBQUANTIZERS = 96
+VECTOR_PQ_BITS = 8
+VECTOR_PQ_TRAIN_SIZE = 100_000
+VECTOR_TOP_K = 10
+# Alternative phrasings generated per question (MultiQuery); all rewrites
+# are searched together with the original question
+MULTI_QUERY_COUNT = 3
+
+MULTI_QUERY_PROMPT = """You are helping search a D&D 5e rules and lore corpus.
+Rewrite the user's question as a standalone search query that uses different
+wording or D&D terminology than the original. This is rewrite {variant} of
+several, so vary the angle.
+
+Question: {question}
+Rewritten query:"""
+
+# Served when no vector index is available
+SAMPLE_DOCUMENTS = [
+    {
+        "content": "D&D 5e uses a d20 system for most rolls. Players roll a 20-sided die and add modifiers based on their character's abilities and proficiency.",
+        "source": "Player's Handbook",
+        "chunk_id": "rules_001"
+    },
+    {
+        "content": "Spellcasting in D&D 5e uses spell slots. Each spell has a level, and casting it consumes a spell slot of that level or higher.",
+        "source": "Player's Handbook",
+        "chunk_id": "spells_001"
+    }
+]
+
+class SQLOutput(BaseModel):
+    """Structured SQL generation result."""
+    sql: str = Field(..., description="A single BigQuery SQL query, without markdown formatting")
+
+
+def _validate_sql(sql_query: str) -> str:
+    """
+    Check generated SQL offline and return the query to execute.
+    
+    Raises ValueError unless the SQL parses as a single read-only query in the
+    BigQuery dialect; a LIMIT is added if the query has none. Returns the SQL
+    unchanged when sqlglot is not installed.
+    """
+    if sqlglot is None:
+        return sql_query
+    
+    try:
+        statements = [stmt for stmt in sqlglot.parse(sql_query, read="bigquery") if stmt is not None]
+    except sqlglot.errors.ParseError as e:
+        raise ValueError(f"Generated SQL does not parse: {e}") from e
+    if len(statements) != 1:
+        raise ValueError(f"Expected one SQL statement, got {len(statements)}")
+    
+    statement = statements[0]
+    if not isinstance(statement, exp.Query):
+        raise ValueError(f"Only SELECT queries are allowed, got {statement.key.upper()}")
+    if statement.args.get("limit") is None:
+        return statement.limit(SQL_DEFAULT_LIMIT).sql(dialect="bigquery")
+    return sql_query
+
+
+def _cache_get(cache: "OrderedDict[str, Tuple[float, str]]", key: str, ttl: float) -> Optional[str]:
+    """Return an unexpired value from an LRU cache of (timestamp, value) entries."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] >= ttl:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return entry[1]
+
+
+def _cache_put(cache: "OrderedDict[str, Tuple[float, str]]", key: str, value: str) -> None:
+    """Store a value in an LRU cache, evicting the oldest entry when full."""
+    cache[key] = (time.monotonic(), value)
+    cache.move_to_end(key)
+    if len(cache) > SQL_CACHE_MAX_SIZE:
+        cache.popitem(last=False)
+
+
+def _sync_blob(bucket, blob_name: str, local_path: Path) -> None:
+    """
+    Make local_path a copy of the current generation of a GCS blob.
+    
+    The generation of the local copy is kept in a sidecar file, so the blob is
+    only downloaded when it is missing locally or has been republished. If the
+    bucket cannot be reached, an existing local copy is used as is.
+    """
+    marker_path = local_path.with_name(local_path.name + ".generation")
+    try:
+        blob = bucket.get_blob(blob_name)
+    except Exception as e:
+        if not local_path.exists():
+            raise
+        logger.warning("Could not check gs://%s/%s, using local copy: %s", bucket.name, blob_name, e)
+        return
+    if blob is None:
+        raise FileNotFoundError(f"gs://{bucket.name}/{blob_name} does not exist")
+    
+    generation = str(blob.generation)
+    if local_path.exists() and marker_path.exists() and marker_path.read_text() == generation:
+        return
+    
+    # Downloaded beside the target and renamed into place, so other workers
+    # never map a partially written file
+    partial_path = local_path.with_name(local_path.name + ".partial")
+    blob.download_to_filename(str(partial_path), if_generation_match=blob.generation)
+    os.replace(partial_path, local_path)
+    marker_path.write_text(generation)
+    logger.info("Downloaded gs://%s/%s (generation %s)", bucket.name, blob_name, generation)
+
+
+class QuotaAwareSemaphore:
+    """Bounds concurrent blocking queries and tracks pool utilization."""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.queued = 0
+        self._semaphore = asyncio.Semaphore(limit)
+        self._latencies_ms: Deque[float] = deque(maxlen=POOL_LATENCY_WINDOW)
+    
+    async def run(self, executor: ThreadPoolExecutor, func: Callable, *args) -> Any:
+        """Run a blocking call on the executor once a slot is free."""
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        finally:
+            self._latencies_ms.append((time.perf_counter() - start) * 1000)
+            self.in_flight -= 1
+            self._semaphore.release()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return current utilization and the p95 latency of recent calls."""
+        latencies = sorted(self._latencies_ms)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))] if latencies else None
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+            "samples": len(latencies)
+        }
+
+
+_BQ_SEM = QuotaAwareSemaphore(BQ_MAX_CONCURRENCY)
+
+
+def bigquery_pool_stats() -> Dict[str, Any]:
+    """Return utilization metrics for the shared BigQuery query limiter."""
+    return _BQ_SEM.stats()
+
+
+@functools.lru_cache(maxsize=None)
+def _sql_llm(api_key: str):
+    """Return the shared SQL generation model (and its connection pool) for an API key."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model="gemini-1.5-flash",
+        google_api_key=api_key,
+        temperature=0.1,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _bigquery_database(project_id: str, dataset_id: str, tables: Tuple[str, ...]):
+    """Return the shared SQLDatabase (and its engine's connection pool) for a dataset."""
+    from langchain_community.utilities import SQLDatabase
+    return SQLDatabase.from_uri(
+        f"bigquery://{project_id}/{dataset_id}"
+        f"?use_query_cache=true&maximum_bytes_billed={BIGQUERY_MAX_BYTES_BILLED}",
+        include_tables=list(tables)
+    )
 
 
 class StructuredRetriever:
@@ -15,21 +278,26 @@ class StructuredRetriever:
         self.dataset_id = dataset_id
         self.table_id = table_id
         
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            google_api_key=api_key,
-            temperature=0.1,
-        )
+        # SQL tooling imported lazily to keep module import cheap
+        from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
         
-        self.db = SQLDatabase.from_uri(
-            f"bigquery://{project_id}/{dataset_id}",
-            include_tables=[table_id]
-        )
+        # Shared across retrievers so their connections are reused
+        self.llm = _sql_llm(api_key)
+        self.db = _bigquery_database(project_id, dataset_id, (table_id,))
         
         self.sql_tool = QuerySQLDatabaseTool(db=self.db)
+        self._sql_pool = ThreadPoolExecutor(max_workers=SQL_MAX_WORKERS, thread_name_prefix="bigquery-sql")
+        
+        # Question -> generated SQL, SQL -> query result, and question -> last
+        # error for questions that exhausted self-correction
+        self._sql_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._result_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._failure_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
         
-        self.sql_prompt = ChatPromptTemplate.from_template(
-            """You are a BigQuery SQL expert for D&D monster data.
+        # Schema and rules are formatted once into a static system message so
+        # every request shares an identical prompt prefix; only the question
+        # varies, and it comes last
+        sql_instructions = """You are a BigQuery SQL expert for D&D monster data.
             
 Database Schema:
 Table: {project_id}.{dataset_id}.{table_id}
@@ -40,10 +308,11 @@ Table: {project_id}.{dataset_id}.{table_id}
 - hit_points (INTEGER): Hit points
 - speed (STRING): Movement speeds (walk, fly, swim, etc.)
 - challenge_rating (STRING): Challenge Rating (CR as string, e.g., '1/4', '17', '21')
+- challenge_rating_num (NUMERIC): Challenge Rating as a number (e.g., '1/4' -> 0.25, '17' -> 17); clustering key
 - abilities (STRING): All ability scores formatted as text (STR, DEX, CON, INT, WIS, CHA)
 - skills (STRING): Proficient skills and bonuses
-- damage_resistances (STRING): Damage types the monster resists
-- damage_immunities (STRING): Damage types the monster is immune to
+- damage_resistances (ARRAY<STRING>): Damage types the monster resists
+- damage_immunities (ARRAY<STRING>): Damage types the monster is immune to
 - condition_immunities (STRING): Conditions the monster is immune to
 - senses (STRING): Special senses (darkvision, blindsight, etc.)
 - languages (STRING): Languages the monster can speak/understand
@@ -54,85 +323,221 @@ Table: {project_id}.{dataset_id}.{table_id}
 
 IMPORTANT NOTES:
 - Use backticks around table reference: `{project_id}.{dataset_id}.{table_id}`
-- challenge_rating is STRING, not FLOAT - use LIKE or REGEXP for CR comparisons
-- For CR filtering: SAFE_CAST(REGEXP_EXTRACT(challenge_rating, r'^(\\d+)') AS INT64)
+- For CR comparisons, filtering and ordering use challenge_rating_num, e.g. WHERE challenge_rating_num >= 10, WHERE challenge_rating_num < 1, ORDER BY challenge_rating_num DESC
+- challenge_rating is the display string - select it for output, but never compare or sort on it
 - Use LIKE operator for text searches in abilities, special_abilities, etc.
-
-User Question: {question}
-Write a BigQuery SQL query using the full table reference:"""
+- damage_resistances and damage_immunities are arrays - filter with 'Fire' IN UNNEST(damage_immunities)""".format(
+            project_id=project_id, dataset_id=dataset_id, table_id=table_id
         )
+        self.sql_prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content=sql_instructions),
+            ("human", "User Question: {question}\nWrite a BigQuery SQL query using the full table reference:"),
+        ])
+        # Structured output returns the SQL as a field, with no code fences
+        # or trailing explanation to strip
+        self.sql_chain = self.sql_prompt | self.llm.with_structured_output(SQLOutput)
+    
+    @_transient_retry
+    async def _generate_sql(self, question: str) -> str:
+        """Generate SQL for a question."""
+        result = await self.sql_chain.ainvoke({"question": question})
+        if result is None or not result.sql.strip():
+            raise ValueError("Model returned no SQL")
+        return result.sql.strip()
     
     async def retrieve(self, question: str, max_retries: int = 2) -> Dict[str, Any]:
-        """Retrieve data using Text-to-SQL with self-correction."""
+        """
+        Retrieve data using Text-to-SQL with self-correction.
+        
+        SQL that fails validation or execution is regenerated with the error
+        fed back into the prompt, up to max_retries times. Transient Gemini
+        errors are retried with backoff inside _generate_sql and are not
+        retried again here.
+        
+        SQL that executed successfully is cached per normalized question, and
+        query results per SQL statement, so repeated questions skip Gemini and
+        (for a few minutes) BigQuery as well. Questions that exhausted every
+        correction attempt return their cached failure (with "cached": True)
+        for a few minutes.
+        """
+        key = " ".join(question.lower().split())
+        cached_error = _cache_get(self._failure_cache, key, SQL_FAILURE_CACHE_TTL_SECONDS)
+        if cached_error is not None:
+            return {
+                "type": "structured",
+                "result": f"Error (cached failure): {cached_error}",
+                "sources": [],
+                "success": False,
+                "error": cached_error,
+                "cached": True
+            }
+        
+        prompt_question = question
         for attempt in range(max_retries + 1):
             try:
-                # Generate SQL query
-                chain = self.sql_prompt | self.llm
-                result = await chain.ainvoke({
-                    "question": question,
-                    "project_id": self.project_id,
-                    "dataset_id": self.dataset_id,
-                    "table_id": self.table_id
-                })
-                sql_query = result.content.strip()
-                
-                # Clean SQL formatting
-                if sql_query.startswith("```sql"):
-                    sql_query = sql_query.replace("```sql", "").replace("```", "").strip()
+                # Reuse SQL generated for the same question on the first try;
+                # retries always regenerate
+                sql_query = _cache_get(self._sql_cache, key, SQL_CACHE_TTL_SECONDS) if attempt == 0 else None
+                if sql_query is None:
+                    sql_query = _validate_sql(await self._generate_sql(prompt_question))
                 
-                # Execute query
-                query_result = self.sql_tool.run(sql_query)
+                query_result = _cache_get(self._result_cache, sql_query, SQL_RESULT_CACHE_TTL_SECONDS)
+                if query_result is None:
+                    # Execute query off the event loop (the SQL tool is blocking),
+                    # within the shared BigQuery concurrency limit
+                    query_result = await _BQ_SEM.run(self._sql_pool, self.sql_tool.run, sql_query)
+                    # The SQL tool reports query errors as "Error: ..." text
+                    if str(query_result).startswith("Error"):
+                        raise ValueError(query_result)
+                    _cache_put(self._result_cache, sql_query, query_result)
+                    _cache_put(self._sql_cache, key, sql_query)
                 
                 return {
                     "type": "structured",
                     "query": sql_query,
                     "result": query_result,
                     "attempt": attempt + 1,
+                    "sources": ["D&D Monster Database"],
                     "success": True
                 }
                 
             except Exception as e:
-                if attempt == max_retries:
+                if attempt == max_retries or isinstance(e, _TRANSIENT_ERRORS):
+                    # Transient failures may succeed on the next request
+                    if not isinstance(e, _TRANSIENT_ERRORS):
+                        _cache_put(self._failure_cache, key, str(e))
                     return {
                         "type": "structured",
-                        "result": f"Error after {max_retries + 1} attempts: {str(e)}",
+                        "result": f"Error after {attempt + 1} attempts: {str(e)}",
+                        "sources": [],
                         "success": False,
                         "error": str(e)
                     }
-                print(f"SQL attempt {attempt + 1} failed: {e}")
+                logger.warning("SQL attempt %d failed: %s", attempt + 1, e)
+                # Feed the failure back so the next attempt can correct it
+                prompt_question = f"{question}\n(A previous query for this question failed: {e})"
 
 
 class UnstructuredRetriever:
     """Vector-based retriever for D&D content using FAISS."""
     
-    def __init__(self, data_bucket: str, api_key: str, project_id: str):
+    def __init__(
+        self,
+        data_bucket: str,
+        api_key: str,
+        project_id: str,
+        embedding_api_url: Optional[str] = None
+    ):
         self.data_bucket = data_bucket
         self.project_id = project_id
-        self.vector_store = None
+        self.api_key = api_key
+        self.embedding_api_url = embedding_api_url
+        
+        # The IVF index is built offline (build_ivf_index or build_ivfpq_index)
+        # and loaded once here; without faiss or a published index, sample
+        # documents are served
+        self.index = None
+        self.documents: List[Dict[str, Any]] = []
+        self.embeddings = None
+        try:
+            self._load_index()
+        except Exception as e:
+            logger.warning("FAISS index unavailable, serving sample documents: %s", e)
+            self.index = None
+    
+    def _load_index(self) -> None:
+        """Sync the persisted index from GCS and memory-map it read-only."""
+        import faiss
+        from google.cloud import storage
+        
+        index_path = VECTOR_INDEX_DIR / Path(VECTOR_INDEX_BLOB).name
+        docstore_path = VECTOR_INDEX_DIR / Path(VECTOR_DOCSTORE_BLOB).name
+        VECTOR_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        bucket = storage.Client(project=self.project_id).bucket(self.data_bucket)
+        _sync_blob(bucket, VECTOR_INDEX_BLOB, index_path)
+        _sync_blob(bucket, VECTOR_DOCSTORE_BLOB, docstore_path)
+        
+        # Memory-mapped so the inverted lists are paged in on demand instead of
+        # copied into every worker's heap
+        index = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        faiss.extract_index_ivf(index).nprobe = VECTOR_NPROBE
+        
+        with open(docstore_path, "r", encoding="utf-8") as f:
+            documents = json.load(f)
+        if len(documents) != index.ntotal:
+            raise ValueError(
+                f"Document store has {len(documents)} entries but index has {index.ntotal} vectors"
+            )
+        
+        self.embeddings = create_embeddings(self.api_key, self.embedding_api_url)
+        
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        rewrite_llm = ChatGoogleGenerativeAI(
+            model="gemini-1.5-flash",
+            google_api_key=self.api_key,
+            temperature=0.7
+        )
+        self.rewrite_chain = ChatPromptTemplate.from_template(MULTI_QUERY_PROMPT) | rewrite_llm
+        self.documents = documents
+        self.index = index
+        logger.info("Loaded FAISS index with %d vectors (nprobe=%d)", index.ntotal, VECTOR_NPROBE)
+    
+    async def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed all queries in one batched request rather than one call per rewrite."""
+        embs = await self.embeddings.aembed_documents(queries)
+        return np.asarray(embs, dtype=np.float32)
+    
+    async def _rewrite_question(self, question: str) -> List[str]:
+        """Generate MultiQuery rewrites concurrently; failed rewrites are dropped."""
+        results = await asyncio.gather(
+            *[
+                self.rewrite_chain.ainvoke({"question": question, "variant": variant})
+                for variant in range(1, MULTI_QUERY_COUNT + 1)
+            ],
+            return_exceptions=True
+        )
+        rewrites = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Query rewrite failed: %s", result)
+                continue
+            rewrite = result.content.strip()
+            if rewrite:
+                rewrites.append(rewrite)
+        return rewrites
+    
+    async def _search(self, question: str) -> List[Dict[str, Any]]:
+        """Return the documents nearest to the question and its rewrites."""
+        queries = list(dict.fromkeys([question] + await self._rewrite_question(question)))
+        xq = np.ascontiguousarray(await self._embed_queries(queries), dtype=np.float32)
+        # One search call for all query vectors; index.search releases the
+        # GIL, so it runs off the event loop
+        distances, ids = await asyncio.to_thread(self.index.search, xq, VECTOR_TOP_K)
+        
+        # Merge the per-query hits, keeping each document's best distance
+        best: Dict[int, float] = {}
+        for row_distances, row_ids in zip(distances, ids):
+            for distance, doc_id in zip(row_distances, row_ids):
+                if doc_id >= 0 and distance < best.get(doc_id, math.inf):
+                    best[doc_id] = distance
+        ranked = sorted(best, key=best.get)[:VECTOR_TOP_K]
+        return [self.documents[i] for i in ranked]
     
     async def retrieve(self, question: str) -> Dict[str, Any]:
         """Retrieve documents using vector search."""
         try:
-            # Simplified implementation for now
-            # In full implementation, this would use FAISS + MultiQuery
-            sample_documents = [
-                {
-                    "content": "D&D 5e uses a d20 system for most rolls. Players roll a 20-sided die and add modifiers based on their character's abilities and proficiency.",
-                    "source": "Player's Handbook",
-                    "chunk_id": "rules_001"
-                },
-                {
-                    "content": "Spellcasting in D&D 5e uses spell slots. Each spell has a level, and casting it consumes a spell slot of that level or higher.",
-                    "source": "Player's Handbook", 
-                    "chunk_id": "spells_001"
-                }
-            ]
+            if self.index is not None:
+                documents = await self._search(question)
+            else:
+                documents = SAMPLE_DOCUMENTS
             
             return {
                 "type": "unstructured",
                 "question": question,
-                "documents": sample_documents,
-                "document_count": len(sample_documents),
+                "documents": documents,
+                "document_count": len(documents),
+                # Distinct document sources in retrieval order
+                "sources": list(dict.fromkeys(doc.get("source", "D&D SRD") for doc in documents)),
                 "success": True
             }
             
@@ -142,6 +547,150 @@ class UnstructuredRetriever:
                 "question": question,
                 "documents": [],
                 "document_count": 0,
+                "sources": [],
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+
+def create_embeddings(api_key: str, embedding_api_url: Optional[str] = None):
+    """
+    Create the embeddings backend used for the vector index.
+    
+    An Infinity server (dynamic batching, fp16) is used when its URL is
+    given; otherwise Gemini embeddings. The index must be built and queried
+    with the same backend.
+    """
+    if embedding_api_url:
+        from langchain_community.embeddings import InfinityEmbeddings
+        return InfinityEmbeddings(
+            model=INFINITY_EMBEDDING_MODEL,
+            infinity_api_url=embedding_api_url
+        )
+    
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(
+        model=VECTOR_EMBEDDING_MODEL,
+        google_api_key=api_key
+    )
+
+
+def embed_corpus(embeddings, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    """Embed document chunks for indexing in batches of batch_size texts per request."""
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embeddings.embed_documents(texts[start:start + batch_size]))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def build_ivf_index(vectors: np.ndarray):
+    """
+    Build a FAISS IndexIVFFlat over document embeddings for offline publishing.
+    
+    Uses nlist = sqrt(N) inverted lists, the usual balance between coarse
+    quantizer cost and list scan length. Write the result with
+    faiss.write_index and upload it with its document store to
+    VECTOR_INDEX_BLOB / VECTOR_DOCSTORE_BLOB in the data bucket.
+    
+    Args:
+        vectors: (N, d) document embeddings from embed_corpus, in document
+            store order
+    """
+    import faiss
+    
+    xb = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, d = xb.shape
+    nlist = max(1, int(math.sqrt(n)))
+    quantizer = faiss.IndexFlatL2(d)
+    index = faiss.IndexIVFFlat(quantizer, d, nlist)
+    index.train(xb)
+    index.add(xb)
+    return index
+
+
+def build_ivfpq_index(
+    vectors: np.ndarray,
+    m: int = VECTOR_PQ_SUBQUANTIZERS,
+    nbits: int = VECTOR_PQ_BITS
+):
+    """
+    Build a product-quantized FAISS IndexIVFPQ for corpora too large to hold
+    as full float32 vectors.
+    
+    Each vector is stored as m codes of nbits bits (96 bytes for the default
+    768-d embeddings instead of 3 KB), so the index is ~32x smaller and
+    search scans far less memory at some cost in recall. Coarse and PQ
+    centroids are trained on a random sample of at most VECTOR_PQ_TRAIN_SIZE
+    vectors; nlist is capped so every list gets enough training points.
+    Publish it the same way as build_ivf_index; _load_index handles both.
+    
+    Args:
+        vectors: (N, d) document embeddings from embed_corpus, in document
+            store order
+        m: Number of sub-quantizers; must divide d
+        nbits: Bits per sub-quantizer code
+    """
+    import faiss
+    
+    xb = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, d = xb.shape
+    if d % m:
+        raise ValueError(f"Embedding dimension {d} is not divisible by m={m}")
+    
+    if n > VECTOR_PQ_TRAIN_SIZE:
+        sample = np.random.default_rng(0).choice(n, VECTOR_PQ_TRAIN_SIZE, replace=False)
+        xt = xb[np.sort(sample)]
+    else:
+        xt = xb
+    # FAISS wants ~39 training points per centroid
+    nlist = max(1, min(VECTOR_PQ_NLIST, len(xt) // 39))
+    
+    quantizer = faiss.IndexFlatL2(d)
+    index = faiss.IndexIVFPQ(quantizer, d, nlist, m, nbits)
+    index.train(xt)
+    index.add(xb)
+    return index
+
+
+async def hybrid_retrieve(
+    structured: StructuredRetriever,
+    unstructured: UnstructuredRetriever,
+    question: str
+) -> Dict[str, Any]:
+    """
+    Run both retrievers for a question concurrently and combine the results.
+    
+    The two retrievals are independent I/O (BigQuery and vector search), so
+    they are awaited together; one failing does not discard the other.
+    
+    Returns:
+        A "hybrid" retrieval result holding both individual results, with the
+        sources of each successful retrieval
+    """
+    results = await asyncio.gather(
+        structured.retrieve(question),
+        unstructured.retrieve(question),
+        return_exceptions=True
+    )
+    
+    structured_result, unstructured_result = (
+        {"type": kind, "sources": [], "success": False, "error": str(result)}
+        if isinstance(result, Exception) else result
+        for kind, result in zip(("structured", "unstructured"), results)
+    )
+    
+    sources = list(dict.fromkeys(
+        source
+        for result in (structured_result, unstructured_result)
+        if result.get("success")
+        for source in result.get("sources", [])
+    ))
+    
+    return {
+        "type": "hybrid",
+        "question": question,
+        "structured": structured_result,
+        "unstructured": unstructured_result,
+        "sources": sources,
+        "success": structured_result.get("success", False) or unstructured_result.get("success", False)
+    }
\ No newline at end of file
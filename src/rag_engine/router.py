@@ -6,11 +6,196 @@ as either 'structured' (requiring database queries) or 'unstructured' (requiring
 vector search) based on their intent and content.
 """
 
-from typing import Literal
-from langchain.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import List, Literal, Optional, Tuple
+import numpy as np
+from langchain.schema import HumanMessage, SystemMessage
 from langchain.schema.runnable import RunnableLambda
 
+logger = logging.getLogger(__name__)
+
+# Small, fast model for the one-word classification task
+ROUTER_MODEL = "gemini-1.5-flash-8b"
+
+# Output cap for single-question routing; enough for either label
+ROUTER_MAX_OUTPUT_TOKENS = 4
+
+# Constrained decoding: the model can only emit one of the two route labels
+ROUTE_RESPONSE_SCHEMA = {"type": "STRING", "enum": ["structured", "unstructured"]}
+
+# Maximum number of classified questions kept in the route cache
+ROUTE_CACHE_MAX_SIZE = 1024
+
+# On-disk route cache shared across process restarts, and its entry lifetime
+ROUTE_CACHE_DB_PATH = os.path.expanduser("~/.dnd_oracle/route_cache.db")
+ROUTE_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Semantic route cache: local embedding model, cosine similarity needed for a
+# hit, and how long cached embeddings stay valid
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Questions with numbers ("CR 5" vs "CR 6") are never matched semantically
+_DIGIT_PATTERN = re.compile(r"\d")
+
+# Surface signals for the local keyword router; a question is routed without
+# the LLM when one side outscores the other by KEYWORD_ROUTE_MIN_MARGIN
+STRUCTURED_SIGNALS = re.compile(
+    r"\b(ac|armor class|hit points|hp|cr\s*\d+|challenge rating|strength|dexterity|"
+    r"constitution|resistance|resistant|immunity|immune|list|show|which|how many|"
+    r"above|below|more|fewer|highest|lowest)\b"
+)
+UNSTRUCTURED_SIGNALS = re.compile(
+    r"\b(how does|how do|explain|describe|create|lore|history|rules for|tell me about)\b"
+)
+KEYWORD_ROUTE_MIN_MARGIN = 2
+
+# Routing instructions and few-shot examples, identical for every request
+ROUTER_INSTRUCTIONS = """You are an expert query routing assistant for a Dungeons & Dragons knowledge base. \
+Your task is to classify the user's question into one of two categories based on its intent: 'structured' or 'unstructured'.
+
+'structured' questions ask for specific, factual data about game entities, such as monster statistics. These questions often involve numbers, lists, comparisons, or filtering. \
+Examples: 
+- "What is a Beholder's armor class?"
+- "List all monsters with resistance to cold damage."
+- "Which dragon has more hit points, an adult red or an adult black?"
+- "Show me all CR 5 monsters."
+- "What monsters have a Strength score above 20?"
+
+'unstructured' questions ask about rules, lore, spell descriptions, or ask for creative narrative content. These questions are typically explanatory or generative in nature. \
+Examples: 
+- "How does the grappling condition work?"
+- "Can you describe a spooky, haunted forest?"
+- "What is the history of the elves in the Forgotten Realms?"
+- "Explain how spell slots work in D&D 5e."
+- "Create a description for a tavern scene."
+
+Based on the user's question below, output only the single word 'structured' or 'unstructured' and nothing else."""
+
+# Human turn for single-question classification, wrapped around the question
+ROUTER_QUESTION_PREFIX = "User Question: "
+ROUTER_QUESTION_SUFFIX = "\nClassification:"
+
+# Human turn for batched classification; answers carry the question number so
+# they are matched by number, not by line position
+BATCH_ROUTER_REQUEST = """Classify each of the following numbered questions as 'structured' or 'unstructured'.
+Output one line per question in the form '<number>. <classification>', and nothing else.
+
+{questions}"""
+_BATCH_ANSWER_PATTERN = re.compile(r"^\s*(\d+)\s*[.):-]?\s*(structured|unstructured)\b", re.IGNORECASE)
+
+# Canonical questions classified in one batch at startup so the route cache is
+# warm before the first request (see QueryRouter.warmup)
+COMMON_DND_QUERIES = (
+    "What is a Beholder's armor class?",
+    "What is a dragon's armor class?",
+    "How many hit points does an Adult Red Dragon have?",
+    "What is the challenge rating of a Lich?",
+    "Show me all dragons",
+    "Show me all dragons in the database",
+    "Show me all CR 5 monsters.",
+    "List all undead monsters.",
+    "List all monsters with resistance to cold damage.",
+    "Which monsters have fire immunity?",
+    "Which monsters are immune to poison damage?",
+    "Which dragon has more hit points, an adult red or an adult black?",
+    "What monsters have a Strength score above 20?",
+    "What monsters have over 100 hit points?",
+    "Which monsters have the highest armor class?",
+    "How many fiends are in the database?",
+    "What is the speed of a Giant Spider?",
+    "What languages does a Mind Flayer speak?",
+    "What are the senses of a Gelatinous Cube?",
+    "List all Large beasts.",
+    "Which monsters are lawful evil?",
+    "What is a Goblin's Dexterity score?",
+    "Show me monsters with a challenge rating below 1.",
+    "Which giants have the most hit points?",
+    "What damage resistances does a Vampire have?",
+    "How does grappling work in D&D?",
+    "How does the grappling condition work?",
+    "What are the rules for grappling in D&D?",
+    "How do spell slots work in D&D?",
+    "Explain how spell slots work in D&D 5e.",
+    "Tell me about spellcasting",
+    "How does advantage and disadvantage work?",
+    "How do opportunity attacks work?",
+    "Explain how concentration works for spells.",
+    "How does cover work in combat?",
+    "What happens when a character drops to 0 hit points?",
+    "How do death saving throws work?",
+    "How does a long rest work?",
+    "Explain the rules for surprise.",
+    "How does initiative work?",
+    "How do I calculate armor class?",
+    "What is the history of the elves in the Forgotten Realms?",
+    "Tell me about the lore of the Underdark.",
+    "Describe a spooky, abandoned tavern in a haunted forest",
+    "Can you describe a spooky, haunted forest?",
+    "Create a description for a tavern scene.",
+    "Describe the lair of an ancient dragon.",
+    "Create a mysterious NPC for a city adventure.",
+    "Tell me about the gods of the Forgotten Realms.",
+    "Explain how multiclassing works.",
+)
+
+# Canned answers for common rules questions, keyed on the normalized question;
+# a hit skips both retrieval and answer generation
+FAQ_ANSWERS = {
+    "how does grappling work": (
+        "When you want to grab a creature or wrestle with it, you can use the Attack action "
+        "to make a special melee attack, a grapple. The target must be no more than one size "
+        "larger than you. You make a Strength (Athletics) check contested by the target's "
+        "Strength (Athletics) or Dexterity (Acrobatics) check. If you succeed, the target is "
+        "grappled: its speed becomes 0 until it escapes, which it can attempt as an action "
+        "with the same contest."
+    ),
+    "how does the grappled condition work": (
+        "A grappled creature's speed becomes 0, and it can't benefit from any bonus to its "
+        "speed. The condition ends if the grappler is incapacitated, or if an effect removes "
+        "the grappled creature from the reach of the grappler."
+    ),
+    "how does advantage work": (
+        "When you have advantage or disadvantage, you roll a second d20 when you make the "
+        "roll. Use the higher of the two rolls if you have advantage, and the lower if you "
+        "have disadvantage. If circumstances cause a roll to have both, they cancel out and "
+        "you roll one d20."
+    ),
+}
+
+def faq_answer(key: str) -> Optional[str]:
+    """Return the canned answer for a normalized question, ignoring trailing punctuation."""
+    return FAQ_ANSWERS.get(key.rstrip("?!. "))
+
+def _question_hash(key: str) -> bytes:
+    """Compact fixed-size key for a normalized question."""
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+def keyword_route(question: str) -> Optional[Literal["structured", "unstructured"]]:
+    """
+    Classify a normalized (lowercase) question from keyword signals alone.
+    
+    Returns:
+        The route when the keyword evidence is decisive, otherwise None so the
+        caller can fall back to the LLM
+    """
+    score = len(STRUCTURED_SIGNALS.findall(question)) - len(UNSTRUCTURED_SIGNALS.findall(question))
+    if score >= KEYWORD_ROUTE_MIN_MARGIN:
+        return "structured"
+    if score <= -KEYWORD_ROUTE_MIN_MARGIN:
+        return "unstructured"
+    return None
+
 class QueryRouter:
     """
     Intelligent query router that uses Gemini to classify D&D-related queries.
@@ -20,48 +205,76 @@ class QueryRouter:
     - Unstructured path: Vector search against D&D SRD text content
     """
     
-    def __init__(self, api_key: str, model_name: str = "gemini-1.5-flash"):
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = ROUTER_MODEL,
+        cache_path: Optional[str] = ROUTE_CACHE_DB_PATH
+    ):
         """
         Initialize the query router.
         
         Args:
             api_key: Google API key for Gemini
             model_name: Gemini model to use for classification
+            cache_path: SQLite file for the persistent route cache (None disables it)
         """
+        # Gemini SDK imported lazily to keep module import cheap
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        
+        # Single-question routing is constrained to the route labels and
+        # stops after the first line and a few tokens
         self.llm = ChatGoogleGenerativeAI(
             model=model_name,
             google_api_key=api_key,
             temperature=0.1,  # Low temperature for consistent classification
+            max_output_tokens=ROUTER_MAX_OUTPUT_TOKENS,
+            stop=["\n"],
+            n=1,
+            response_mime_type="text/x.enum",
+            response_schema=ROUTE_RESPONSE_SCHEMA,
         )
-        
-        self.router_prompt = ChatPromptTemplate.from_template(
-            """You are an expert query routing assistant for a Dungeons & Dragons knowledge base. \
-Your task is to classify the user's question into one of two categories based on its intent: 'structured' or 'unstructured'.
-
-'structured' questions ask for specific, factual data about game entities, such as monster statistics. These questions often involve numbers, lists, comparisons, or filtering. \
-Examples: 
-- "What is a Beholder's armor class?"
-- "List all monsters with resistance to cold damage."
-- "Which dragon has more hit points, an adult red or an adult black?"
-- "Show me all CR 5 monsters."
-- "What monsters have a Strength score above 20?"
-
-'unstructured' questions ask about rules, lore, spell descriptions, or ask for creative narrative content. These questions are typically explanatory or generative in nature. \
-Examples: 
-- "How does the grappling condition work?"
-- "Can you describe a spooky, haunted forest?"
-- "What is the history of the elves in the Forgotten Realms?"
-- "Explain how spell slots work in D&D 5e."
-- "Create a description for a tavern scene."
-
-Based on the user's question below, output only the single word 'structured' or 'unstructured' and nothing else.
-
-User Question: {question}
-Classification:"""
+        # Batched routing answers one line per question, so it is not capped
+        self.batch_llm = ChatGoogleGenerativeAI(
+            model=model_name,
+            google_api_key=api_key,
+            temperature=0.1,
+            n=1,
         )
         
-        # Create the router chain
-        self.router_chain = self.router_prompt | self.llm
+        # Static instructions go in a system message built once, so every
+        # request shares an identical prompt prefix; only the human turn is
+        # assembled per call, without template formatting or chain dispatch
+        self._system_message = SystemMessage(content=ROUTER_INSTRUCTIONS)
+        
+        # LRU cache of routing decisions keyed on the normalized question
+        self._route_cache: "OrderedDict[str, str]" = OrderedDict()
+        
+        # Persistent route cache; routing still works if the file cannot be opened.
+        # Lookups and writes run on one dedicated thread, off the event loop
+        self._route_db = None
+        self._route_db_executor = None
+        if cache_path:
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                self._route_db = sqlite3.connect(cache_path, check_same_thread=False)
+                self._route_db.execute(
+                    "CREATE TABLE IF NOT EXISTS routes (q_hash BLOB PRIMARY KEY, route TEXT, ts INTEGER)"
+                )
+                self._route_db.commit()
+                self._route_db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="route-cache")
+            except (OSError, sqlite3.Error) as e:
+                logger.info("Persistent route cache disabled: %s", e)
+                self._route_db = None
+        
+        # Semantic cache for rephrased questions; it is skipped until
+        # load_embedder() has loaded the embedding model, so no request pays
+        # for the download
+        self._embedder = None
+        self._embedder_unavailable = False
+        self._cache_embs: Optional[np.ndarray] = None
+        self._cache_routes: list = []
+        self._cache_times: list = []
     
     async def route_query(self, question: str) -> Literal["structured", "unstructured"]:
         """
@@ -73,37 +286,279 @@ Classification:"""
         Returns:
             Either "structured" or "unstructured" indicating the routing decision
         """
+        key = " ".join(question.lower().split())
+        cached, question_emb = await self._cached_route(key, question)
+        if cached is not None:
+            return cached
+        
         try:
             # Get classification from Gemini
-            result = await self.router_chain.ainvoke({"question": question})
+            result = await self.llm.ainvoke([
+                self._system_message,
+                HumanMessage(content=ROUTER_QUESTION_PREFIX + question + ROUTER_QUESTION_SUFFIX),
+            ])
             classification = result.content.strip().lower()
             
             # Ensure we return a valid classification
             if classification in ["structured", "unstructured"]:
+                self._store_route(key, question_emb, classification)
+                await self._persist_routes([(key, classification)])
                 return classification
             else:
                 # Default to unstructured if classification is unclear
-                print(f"Warning: Unclear classification '{classification}', defaulting to 'unstructured'")
+                logger.warning("Unclear classification '%s', defaulting to 'unstructured'", classification)
                 return "unstructured"
                 
         except Exception as e:
-            print(f"Error in query routing: {e}")
+            logger.error("Error in query routing: %s", e)
             # Default to unstructured path on error
             return "unstructured"
     
-    def create_routing_runnable(self):
+    async def route_queries(self, questions: List[str]) -> List[Literal["structured", "unstructured"]]:
         """
-        Create a LangChain Runnable for integration with LCEL chains.
+        Route several queries with at most one Gemini call.
+        
+        Cached questions are answered locally; the rest are sent together as a
+        numbered list. Answers are matched back by their number; a question
+        without exactly one numbered answer defaults to unstructured and is
+        not cached.
+        
+        Args:
+            questions: The user questions to classify
+            
+        Returns:
+            One routing decision per question, in the same order
+        """
+        routes: List[Optional[str]] = [None] * len(questions)
+        pending = {}  # normalized question -> (question, embedding, indices)
+        
+        for index, question in enumerate(questions):
+            key = " ".join(question.lower().split())
+            if key in pending:
+                pending[key][2].append(index)
+                continue
+            cached, question_emb = await self._cached_route(key, question)
+            if cached is not None:
+                routes[index] = cached
+            else:
+                pending[key] = (question, question_emb, [index])
+        
+        if pending:
+            numbered = "\n".join(
+                f"{number}. {question}"
+                for number, (question, _, _) in enumerate(pending.values(), start=1)
+            )
+            try:
+                result = await self.batch_llm.ainvoke([
+                    self._system_message,
+                    HumanMessage(content=BATCH_ROUTER_REQUEST.format(questions=numbered)),
+                ])
+                answers = {}  # question number -> classifications given for it
+                for line in result.content.splitlines():
+                    match = _BATCH_ANSWER_PATTERN.match(line)
+                    if match:
+                        answers.setdefault(int(match.group(1)), []).append(match.group(2).lower())
+            except Exception as e:
+                logger.error("Error in batch query routing: %s", e)
+                answers = {}
+            
+            fresh = []  # (key, route) pairs written to the on-disk cache in one commit
+            for number, (key, (_, question_emb, indices)) in enumerate(pending.items(), start=1):
+                given = answers.get(number, [])
+                classification = given[0] if len(given) == 1 else ""
+                if classification in ["structured", "unstructured"]:
+                    self._store_route(key, question_emb, classification)
+                    fresh.append((key, classification))
+                else:
+                    # Default to unstructured if classification is unclear
+                    logger.warning("Unclear classification '%s', defaulting to 'unstructured'", classification)
+                    classification = "unstructured"
+                for index in indices:
+                    routes[index] = classification
+            await self._persist_routes(fresh)
+        
+        return routes
+    
+    async def warmup(self, queries=COMMON_DND_QUERIES) -> None:
+        """
+        Populate the route caches for a known set of questions.
+        
+        Uncached questions are classified together in a single batched call
+        (see route_queries), which stores every decision in the caches.
+        
+        Args:
+            queries: Questions to pre-classify (defaults to COMMON_DND_QUERIES)
+        """
+        await self.route_queries(list(queries))
+    
+    async def _cached_route(self, key: str, question: str) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Look a question up in the exact and semantic caches.
+        
+        Returns:
+            The cached route (or None) and the question embedding, if one was computed
+        """
+        cached = self._route_cache.get(key)
+        if cached is not None:
+            self._route_cache.move_to_end(key)
+            return cached, None
+        
+        cached = keyword_route(key)
+        if cached is not None:
+            self._remember_route(key, cached)
+            return cached, None
+        
+        cached = await self._run_route_db(self._load_persisted_route, key)
+        if cached is not None:
+            self._remember_route(key, cached)
+            return cached, None
+        
+        question_emb = None
+        if not _DIGIT_PATTERN.search(question):
+            question_emb = await self._embed(question)
+        if question_emb is not None:
+            cached = self._semantic_lookup(question_emb)
+            if cached is not None:
+                self._remember_route(key, cached)
+        return cached, question_emb
+    
+    def _store_route(self, key: str, question_emb: Optional[np.ndarray], route: str) -> None:
+        """Record a fresh LLM routing decision in the in-memory caches."""
+        self._remember_route(key, route)
+        if question_emb is not None:
+            self._semantic_store(question_emb, route)
+    
+    async def _run_route_db(self, func, *args):
+        """Run a blocking on-disk cache call on the cache thread; None when the cache is off."""
+        if self._route_db is None:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(self._route_db_executor, func, *args)
+    
+    async def _persist_routes(self, entries: List[Tuple[str, str]]) -> None:
+        """Write fresh routing decisions to the on-disk cache in a single commit."""
+        if entries:
+            await self._run_route_db(self._write_persisted_routes, entries)
+    
+    def _load_persisted_route(self, key: str) -> Optional[str]:
+        """Return an unexpired route for the question from the on-disk cache."""
+        if self._route_db is None:
+            return None
+        try:
+            row = self._route_db.execute(
+                "SELECT route FROM routes WHERE q_hash = ? AND ts >= ?",
+                (_question_hash(key), int(time.time()) - ROUTE_CACHE_TTL_SECONDS),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Route cache lookup failed: %s", e)
+            return None
+        return row[0] if row else None
+    
+    def _write_persisted_routes(self, entries: List[Tuple[str, str]]) -> None:
+        """Write routing decisions to the on-disk cache."""
+        now = int(time.time())
+        try:
+            self._route_db.executemany(
+                "INSERT OR REPLACE INTO routes (q_hash, route, ts) VALUES (?, ?, ?)",
+                [(_question_hash(key), route, now) for key, route in entries],
+            )
+            self._route_db.commit()
+        except sqlite3.Error as e:
+            logger.warning("Route cache write failed: %s", e)
+    
+    def _remember_route(self, key: str, route: str) -> None:
+        """Store a routing decision in the exact-match LRU cache."""
+        self._route_cache[key] = route
+        if len(self._route_cache) > ROUTE_CACHE_MAX_SIZE:
+            self._route_cache.popitem(last=False)
+    
+    async def load_embedder(self) -> None:
+        """
+        Load the semantic cache embedding model off the event loop.
+        
+        Called once at startup; without sentence-transformers (or if the
+        model cannot be loaded) the semantic cache stays disabled.
+        """
+        if self._embedder is not None or self._embedder_unavailable:
+            return
+        try:
+            from sentence_transformers import SentenceTransformer
+            self._embedder = await asyncio.to_thread(SentenceTransformer, SEMANTIC_CACHE_MODEL)
+        except Exception as e:
+            logger.info("Semantic route cache disabled: %s", e)
+            self._embedder_unavailable = True
+    
+    async def _embed(self, question: str) -> Optional[np.ndarray]:
+        """Return the normalized embedding of a question, or None if no model is loaded."""
+        if self._embedder is None:
+            return None
+        
+        embeddings = await asyncio.to_thread(
+            self._embedder.encode, [question], normalize_embeddings=True
+        )
+        return np.asarray(embeddings[0], dtype=np.float32)
+    
+    def _semantic_lookup(self, question_emb: np.ndarray) -> Optional[str]:
+        """Return the cached route of the most similar recent question, if similar enough."""
+        if self._cache_embs is None:
+            return None
+        
+        # Drop entries older than the TTL (timestamps are in insertion order)
+        cutoff = time.time() - SEMANTIC_CACHE_TTL_SECONDS
+        expired = 0
+        while expired < len(self._cache_times) and self._cache_times[expired] < cutoff:
+            expired += 1
+        if expired:
+            self._cache_embs = self._cache_embs[expired:]
+            del self._cache_routes[:expired]
+            del self._cache_times[:expired]
+        if not self._cache_routes:
+            return None
+        
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        similarities = self._cache_embs @ question_emb
+        best = int(similarities.argmax())
+        if similarities[best] >= SEMANTIC_CACHE_THRESHOLD:
+            return self._cache_routes[best]
+        return None
+    
+    def _semantic_store(self, question_emb: np.ndarray, route: str) -> None:
+        """Add a classified question embedding to the semantic cache."""
+        if self._cache_embs is None:
+            self._cache_embs = question_emb[np.newaxis, :]
+        else:
+            self._cache_embs = np.vstack([self._cache_embs, question_emb])[-ROUTE_CACHE_MAX_SIZE:]
+        self._cache_routes = (self._cache_routes + [route])[-ROUTE_CACHE_MAX_SIZE:]
+        self._cache_times = (self._cache_times + [time.time()])[-ROUTE_CACHE_MAX_SIZE:]
+    
+    @cached_property
+    def routing_runnable(self) -> RunnableLambda:
+        """
+        LangChain Runnable for integration with LCEL chains, built once per router.
         
         Returns:
             A RunnableLambda that can be used in LangChain pipelines
         """
         async def route_function(inputs: dict) -> dict:
             question = inputs.get("question", "")
+            key = " ".join(question.lower().split())
             route = await self.route_query(question)
-            return {"question": question, "route": route}
+            return {
+                "question": question,
+                "route": route,
+                "confidence": "high" if keyword_route(key) == route else "model",
+                "faq_hit": faq_answer(key) if route == "unstructured" else None,
+            }
         
         return RunnableLambda(route_function)
+    
+    def create_routing_runnable(self) -> RunnableLambda:
+        """
+        Return the LangChain Runnable for integration with LCEL chains.
+        
+        Returns:
+            The router's shared RunnableLambda (see routing_runnable)
+        """
+        return self.routing_runnable
 
 
 def create_conditional_chain(router: QueryRouter, structured_chain, unstructured_chain):
@@ -125,6 +580,10 @@ def create_conditional_chain(router: QueryRouter, structured_chain, unstructured
         route = inputs.get("route")
         question = inputs.get("question")
         
+        # Common rules questions are answered without retrieval or generation
+        if inputs.get("faq_hit"):
+            return {"answer": inputs["faq_hit"], "route": "faq", "cached": True}
+        
         if route == "structured":
             return await structured_chain.ainvoke({"question": question})
         else:
@@ -132,7 +591,7 @@ def create_conditional_chain(router: QueryRouter, structured_chain, unstructured
     
     # Create the complete routing pipeline
     routing_chain = (
-        router.create_routing_runnable() 
+        router.routing_runnable
         | RunnableLambda(route_to_chain)
     )
     
@@ -13,21 +13,17 @@ print("🔍 Environment Variable Check")
 print("=" * 40)
 
 # Check all our required variables
-env_vars = {
-    "PROJECT_ID": os.getenv("PROJECT_ID"),
-    "DATASET_ID": os.getenv("DATASET_ID"), 
-    "TABLE_ID": os.getenv("TABLE_ID"),
-    "DATA_BUCKET": os.getenv("DATA_BUCKET"),
-    "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY"),
-    "ENVIRONMENT": os.getenv("ENVIRONMENT")
-}
+ENV_KEYS = ("PROJECT_ID", "DATASET_ID", "TABLE_ID", "DATA_BUCKET", "GOOGLE_API_KEY", "ENVIRONMENT")
 
-for key, value in env_vars.items():
-    if value:
+env = os.environ
+for key in ENV_KEYS:
+    value = env.get(key)
+    if not value:
+        print("❌", f"{key}: NOT SET")
+    elif key == "GOOGLE_API_KEY" and len(value) > 10:
         # Hide API key for security
-        display_value = value[:10] + "..." if key == "GOOGLE_API_KEY" and len(value) > 10 else value
-        print(f"✅ {key}: {display_value}")
+        print("✅", f"{key}: {value[:10]}...")
     else:
-        print(f"❌ {key}: NOT SET")
+        print("✅", f"{key}: {value}")
 
 print("\n🎯 Ready to start server!") 
\ No newline at end of file
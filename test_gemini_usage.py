@@ -14,7 +14,7 @@ load_dotenv()
 # Add src to path
 sys.path.append('src')
 
-from rag_engine.router import QueryRouter
+from rag_engine.router import COMMON_DND_QUERIES, QueryRouter
 from rag_engine.retrievers import StructuredRetriever
 from langchain_google_genai import ChatGoogleGenerativeAI
 
@@ -59,11 +59,14 @@ async def test_router_with_logging():
         "How do spell slots work in D&D?"
     ]
     
-    for query in test_queries:
+    # Warm the router with the shared query set and these queries in one
+    # classification call; the lookups below are then served from cache
+    print(f"📤 Sending {len(COMMON_DND_QUERIES) + len(test_queries)} queries to Gemini in one classification call...")
+    await router.warmup(COMMON_DND_QUERIES + tuple(test_queries))
+    routes = await router.route_queries(test_queries)
+    
+    for query, route in zip(test_queries, routes):
         print(f"\n📝 Testing: \"{query}\"")
-        print("📤 Sending to Gemini for classification...")
-        
-        route = await router.route_query(query)
         print(f"📥 Gemini classified as: {route}")
 
 async def test_sql_generation():
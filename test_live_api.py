@@ -3,41 +3,54 @@
 Test the live Dungeon Master's Oracle API
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 import time
 
 API_BASE = "http://127.0.0.1:8080"
 
-def test_health():
+# Request bodies are pre-encoded with orjson
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Maximum query requests in flight at once
+MAX_CONCURRENT_QUERIES = 8
+
+async def test_health(client):
     """Test the health endpoint."""
     print("🏥 Testing Health Endpoint...")
-    response = requests.get(f"{API_BASE}/health")
+    response = await client.get("/health")
     print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
+    print(f"Response: {orjson.loads(response.content)}")
     return response.status_code == 200
 
-def test_query(query_text, description):
-    """Test a query endpoint."""
-    print(f"\n📝 Testing: {description}")
-    print(f"❓ Query: \"{query_text}\"")
-    
+async def post_query(client, semaphore, query_text):
+    """Send one query and return (elapsed seconds, response)."""
     payload = {
         "query": query_text,
         "session_id": "test-session-001"
     }
     
-    start_time = time.time()
+    async with semaphore:
+        start_time = time.time()
+        response = await client.post("/query", content=orjson.dumps(payload), headers=JSON_HEADERS)
+        return time.time() - start_time, response
+
+def report_query(query_text, description, outcome):
+    """Print the result of a query request made by post_query."""
+    print(f"\n📝 Testing: {description}")
+    print(f"❓ Query: \"{query_text}\"")
     
     try:
-        response = requests.post(f"{API_BASE}/query", json=payload, timeout=30)
-        end_time = time.time()
+        if isinstance(outcome, Exception):
+            raise outcome
+        elapsed, response = outcome
         
-        print(f"⏱️  Response time: {(end_time - start_time):.2f}s")
+        print(f"⏱️  Response time: {elapsed:.2f}s")
         print(f"📊 Status: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"🛤️  Route: {result.get('route', 'unknown')}")
             print(f"✅ Success: {result.get('retrieval_success', False)}")
             
@@ -57,7 +70,15 @@ def test_query(query_text, description):
         print(f"❌ Request failed: {e}")
         return False
 
-def test_narrate():
+async def run_queries(client, test_queries):
+    """Send all test queries concurrently and return their outcomes in order."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+    return await asyncio.gather(
+        *(post_query(client, semaphore, query) for query, _ in test_queries),
+        return_exceptions=True
+    )
+
+async def test_narrate(client):
     """Test the narrative generation endpoint."""
     print(f"\n🎭 Testing Narrative Generation...")
     
@@ -67,10 +88,10 @@ def test_narrate():
     }
     
     try:
-        response = requests.post(f"{API_BASE}/narrate", json=payload, timeout=30)
+        response = await client.post("/narrate", content=orjson.dumps(payload), headers=JSON_HEADERS)
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"✅ Narrative generated successfully!")
             narrative = result.get('text', 'No narrative')
             print(f"📖 Story: {narrative[:300]}{'...' if len(narrative) > 300 else ''}")
@@ -83,13 +104,18 @@ def test_narrate():
         print(f"❌ Request failed: {e}")
         return False
 
-def main():
-    """Run all API tests."""
+async def main():
+    """Run all API tests over one pooled, keep-alive HTTP client."""
+    async with httpx.AsyncClient(base_url=API_BASE, timeout=30) as client:
+        await run_all_tests(client)
+
+async def run_all_tests(client):
+    """Run the health, query and narrative tests."""
     print("🎲 Testing Dungeon Master's Oracle API")
     print("=" * 60)
     
     # Test health first
-    if not test_health():
+    if not await test_health(client):
         print("❌ Health check failed! Server may not be running.")
         return
     
@@ -106,14 +132,14 @@ def main():
     ]
     
     successful_tests = 0
-    for query, description in test_queries:
-        if test_query(query, description):
+    outcomes = await run_queries(client, test_queries)
+    for (query, description), outcome in zip(test_queries, outcomes):
+        if report_query(query, description, outcome):
             successful_tests += 1
-        time.sleep(1)  # Small delay between requests
     
     # Test narrative generation
     print("\n" + "=" * 60)
-    if test_narrate():
+    if await test_narrate(client):
         successful_tests += 1
     
     # Summary
@@ -130,4 +156,4 @@ def main():
         print(f"\n⚠️  {total_tests - successful_tests} tests failed. Check the logs above.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
@@ -15,7 +15,7 @@ load_dotenv()
 # Add src to path so we can import the RAG engine
 sys.path.append('src')
 
-from rag_engine.hybrid_rag import HybridRAGEngine
+from rag_engine import COMMON_DND_QUERIES, HybridRAGEngine
 
 async def test_rag_connection():
     """Test the RAG system connection to BigQuery."""
@@ -78,13 +78,35 @@ async def test_rag_connection():
         print(f"\n🧪 Running {len(test_queries)} test queries...")
         print("-" * 60)
         
-        for i, test in enumerate(test_queries, 1):
+        # Classify the shared query set and every test query in one Gemini
+        # call; each query below then hits the router cache instead of making
+        # its own classification call
+        await rag_engine.router.warmup(
+            COMMON_DND_QUERIES + tuple(test['query'] for test in test_queries)
+        )
+        
+        # Run the queries concurrently (a few at a time) and report each one
+        # as soon as it finishes
+        semaphore = asyncio.Semaphore(8)
+        
+        async def run_test(i, test):
+            async with semaphore:
+                try:
+                    return i, test, await rag_engine.query(test['query'])
+                except Exception as e:
+                    return i, test, e
+        
+        for completed in asyncio.as_completed(
+            [run_test(i, test) for i, test in enumerate(test_queries, 1)]
+        ):
+            i, test, result = await completed
             print(f"\n📝 Test {i}: {test['description']}")
             print(f"❓ Query: \"{test['query']}\"")
             print(f"🎯 Expected route: {test['expected_route']}")
             
             try:
-                result = await rag_engine.query(test['query'])
+                if isinstance(result, Exception):
+                    raise result
                 
                 actual_route = result.get('route', 'unknown')
                 success = result.get('retrieval_success', False)
@@ -2,28 +2,31 @@
 Basic API tests for the Dungeon Master's Oracle
 """
 
+import json
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 import sys
 import os
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from api.main import app
+from api.main import app, get_rag_engine
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app."""
+    """Create a test client for the FastAPI app, shared by the whole session."""
     return TestClient(app)
 
 
 @pytest.fixture
 def mock_rag_engine():
-    """Mock RAG engine for testing."""
+    """Mock RAG engine for testing, served through the get_rag_engine dependency."""
     mock_engine = Mock()
+    mock_engine.query = AsyncMock()
+    mock_engine.narrate = AsyncMock()
     mock_engine.query.return_value = {
         "answer": "A Beholder has an Armor Class of 18 (Natural Armor).",
         "route": "structured",
@@ -37,7 +40,10 @@ def mock_rag_engine():
         "style": "mysterious",
         "success": True
     }
-    return mock_engine
+    
+    app.dependency_overrides[get_rag_engine] = lambda: mock_engine
+    yield mock_engine
+    app.dependency_overrides.pop(get_rag_engine, None)
 
 
 def test_health_endpoint(client):
@@ -51,6 +57,17 @@ def test_health_endpoint(client):
     assert "version" in data
 
 
+def test_debug_pool_endpoint(client):
+    """Test the BigQuery pool metrics endpoint."""
+    response = client.get("/debug/pool")
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["in_flight"] == 0
+    assert data["queued"] == 0
+    assert data["limit"] > 0
+
+
 def test_root_endpoint(client):
     """Test the root endpoint."""
     response = client.get("/")
@@ -62,19 +79,15 @@ def test_root_endpoint(client):
     assert data["status"] == "operational"
 
 
-@patch('api.main.rag_engine')
-def test_query_endpoint_structured(mock_engine_global, client, mock_rag_engine):
+def test_query_endpoint_structured(client, mock_rag_engine):
     """Test the query endpoint with a structured query."""
-    mock_engine_global.__bool__ = Mock(return_value=True)
-    
-    with patch('api.main.get_rag_engine', return_value=mock_rag_engine):
-        response = client.post(
-            "/query",
-            json={
-                "query": "What is a Beholder's armor class?",
-                "session_id": "test_session"
-            }
-        )
+    response = client.post(
+        "/query",
+        json={
+            "query": "What is a Beholder's armor class?",
+            "session_id": "test_session"
+        }
+    )
     
     assert response.status_code == 200
     
@@ -85,11 +98,8 @@ def test_query_endpoint_structured(mock_engine_global, client, mock_rag_engine):
     assert data["retrieval_success"] is True
 
 
-@patch('api.main.rag_engine')
-def test_query_endpoint_unstructured(mock_engine_global, client, mock_rag_engine):
+def test_query_endpoint_unstructured(client, mock_rag_engine):
     """Test the query endpoint with an unstructured query."""
-    mock_engine_global.__bool__ = Mock(return_value=True)
-    
     # Update mock for unstructured response
     mock_rag_engine.query.return_value = {
         "answer": "Grappling is a special melee attack...",
@@ -100,14 +110,13 @@ def test_query_endpoint_unstructured(mock_engine_global, client, mock_rag_engine
         "metadata": {"query_type": "unstructured"}
     }
     
-    with patch('api.main.get_rag_engine', return_value=mock_rag_engine):
-        response = client.post(
-            "/query",
-            json={
-                "query": "How does grappling work in D&D?",
-                "session_id": "test_session"
-            }
-        )
+    response = client.post(
+        "/query",
+        json={
+            "query": "How does grappling work in D&D?",
+            "session_id": "test_session"
+        }
+    )
     
     assert response.status_code == 200
     
@@ -116,19 +125,15 @@ def test_query_endpoint_unstructured(mock_engine_global, client, mock_rag_engine
     assert "D&D SRD" in data["sources"]
 
 
-@patch('api.main.rag_engine')
-def test_narrate_endpoint(mock_engine_global, client, mock_rag_engine):
+def test_narrate_endpoint(client, mock_rag_engine):
     """Test the narrative generation endpoint."""
-    mock_engine_global.__bool__ = Mock(return_value=True)
-    
-    with patch('api.main.get_rag_engine', return_value=mock_rag_engine):
-        response = client.post(
-            "/narrate",
-            json={
-                "prompt": "Describe a spooky tavern",
-                "style": "mysterious"
-            }
-        )
+    response = client.post(
+        "/narrate",
+        json={
+            "prompt": "Describe a spooky tavern",
+            "style": "mysterious"
+        }
+    )
     
     assert response.status_code == 200
     
@@ -138,7 +143,61 @@ def test_narrate_endpoint(mock_engine_global, client, mock_rag_engine):
     assert data["success"] is True
 
 
-def test_query_endpoint_validation_error(client):
+def _events(*events):
+    """Build an async generator factory yielding the given engine events."""
+    async def stream(*args, **kwargs):
+        for event in events:
+            yield event
+    return stream
+
+
+def _sse_payloads(response):
+    """Decode the JSON payloads of a Server-Sent Events response."""
+    return [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+def test_query_stream_endpoint(client, mock_rag_engine):
+    """Test the streaming query endpoint."""
+    mock_rag_engine.query_stream = _events(
+        {"route": "structured", "sources": ["D&D Monster Database"], "retrieval_success": True},
+        {"text": "A Beholder has "},
+        {"text": "an Armor Class of 18."}
+    )
+    
+    response = client.post("/query/stream", json={"query": "What is a Beholder's armor class?"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    
+    events = _sse_payloads(response)
+    assert events[0]["route"] == "structured"
+    assert "".join(event.get("text", "") for event in events) == "A Beholder has an Armor Class of 18."
+    assert events[-1] == {"done": True}
+
+
+def test_narrate_stream_endpoint(client, mock_rag_engine):
+    """Test the streaming narrative endpoint."""
+    mock_rag_engine.narrate_stream = _events({"text": "The old tavern "}, {"text": "stood silent..."})
+    
+    response = client.post(
+        "/narrate/stream",
+        json={
+            "prompt": "Describe a spooky tavern",
+            "style": "mysterious"
+        }
+    )
+    
+    assert response.status_code == 200
+    events = _sse_payloads(response)
+    assert [event.get("text") for event in events[:-1]] == ["The old tavern ", "stood silent..."]
+    assert events[-1] == {"done": True}
+
+
+def test_query_endpoint_validation_error(client, mock_rag_engine):
     """Test query endpoint with invalid input."""
     response = client.post(
         "/query",
@@ -172,15 +231,13 @@ def test_narrate_styles(client, style, mock_rag_engine):
         "success": True
     }
     
-    with patch('api.main.rag_engine', mock_rag_engine), \
-         patch('api.main.get_rag_engine', return_value=mock_rag_engine):
-        response = client.post(
-            "/narrate",
-            json={
-                "prompt": "Test prompt",
-                "style": style
-            }
-        )
+    response = client.post(
+        "/narrate",
+        json={
+            "prompt": "Test prompt",
+            "style": style
+        }
+    )
     
     assert response.status_code == 200
     data = response.json()
@@ -0,0 +1,83 @@
+"""
+Tests for the HybridRAGEngine answer cache
+"""
+
+import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+import sys
+import os
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from rag_engine.hybrid_rag import HybridRAGEngine
+
+
+def _engine(chain_side_effect):
+    """Build an engine routed to unstructured retrieval, with a mocked response chain."""
+    engine = HybridRAGEngine.__new__(HybridRAGEngine)
+    engine._answer_cache = OrderedDict()
+    engine.router = Mock()
+    engine.router.route_query = AsyncMock(return_value="unstructured")
+    engine.unstructured_retriever = Mock()
+    engine.unstructured_retriever.retrieve = AsyncMock(return_value={
+        "type": "unstructured",
+        "documents": [{"content": "Grappling uses Athletics.", "source": "SRD"}],
+        "sources": ["SRD"],
+        "success": True
+    })
+    engine.unstructured_chain = Mock()
+    engine.unstructured_chain.ainvoke = AsyncMock(side_effect=chain_side_effect)
+    return engine
+
+
+async def _ask_twice(engine, question):
+    first = await engine.query(question)
+    # Let the done callback run before the second lookup
+    await asyncio.sleep(0)
+    second = await engine.query(question)
+    return first, second
+
+
+def test_successful_answer_is_cached():
+    """A successful answer is served from the cache for a repeated question."""
+    engine = _engine([SimpleNamespace(content="Use Athletics.")])
+
+    first, second = asyncio.run(_ask_twice(engine, "How does grappling work?"))
+
+    assert first["answer"] == second["answer"] == "Use Athletics."
+    assert engine.unstructured_chain.ainvoke.await_count == 1
+
+
+def test_generation_failure_is_not_cached():
+    """A failed answer generation is evicted so the next ask generates again."""
+    engine = _engine([RuntimeError("503 Service Unavailable"), SimpleNamespace(content="Use Athletics.")])
+
+    first, second = asyncio.run(_ask_twice(engine, "How does grappling work?"))
+
+    assert first["generation_success"] is False
+    assert first["answer"].startswith("Error generating response")
+    assert second["answer"] == "Use Athletics."
+    assert engine.unstructured_chain.ainvoke.await_count == 2
+
+
+def test_keyword_structured_question_skips_speculative_retrieval():
+    """A question the keywords already route as structured never starts vector retrieval."""
+    engine = _engine([SimpleNamespace(content="AC 15, 7 HP.")])
+    engine.router.route_query = AsyncMock(return_value="structured")
+    engine.structured_retriever = Mock()
+    engine.structured_retriever.retrieve = AsyncMock(return_value={
+        "type": "structured",
+        "result": "[(15, 7)]",
+        "sources": ["D&D Monster Database"],
+        "success": True
+    })
+    engine.structured_chain = Mock()
+    engine.structured_chain.ainvoke = AsyncMock(return_value=SimpleNamespace(content="AC 15, 7 HP."))
+
+    result = asyncio.run(engine.query("What is the armor class and hit points of a goblin?"))
+
+    assert result["route"] == "structured"
+    engine.unstructured_retriever.retrieve.assert_not_called()
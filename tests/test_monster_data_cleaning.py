@@ -0,0 +1,42 @@
+"""
+Tests for the monster CSV cleaning helpers
+"""
+
+import pytest
+import sys
+import os
+
+pa = pytest.importorskip("pyarrow")
+
+# Add the DAG folder to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'data-pipelines', 'dags'))
+
+from monster_data_cleaning import coerce_numeric
+
+
+def test_integer_columns_accept_decimal_text():
+    """Integer text with a fractional part is parsed like pandas.to_numeric, not defaulted."""
+    column = pa.array(["12", " 12.0 ", "12.7", "1e2", None, "", "abc"])
+
+    result = coerce_numeric(column, "int16", 10)
+
+    assert result.type == pa.int16()
+    assert result.to_pylist() == [12, 12, 12, 100, 10, 10, 10]
+
+
+def test_out_of_range_integers_take_the_default():
+    """Values that do not fit the target type are defaulted instead of wrapping or raising."""
+    column = pa.array(["32767", "32768", "-40000", "99999999999999999999"])
+
+    result = coerce_numeric(column, "int16", 10)
+
+    assert result.to_pylist() == [32767, 10, 10, 10]
+
+
+def test_float_columns_parse_fractions():
+    """Float columns keep fractional values and default unparseable ones."""
+    column = pa.chunked_array([["0.25", "17"], ["1/4", None]])
+
+    result = coerce_numeric(column, "float32", 0)
+
+    assert result.to_pylist() == [0.25, 17.0, 0.0, 0.0]
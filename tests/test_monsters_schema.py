@@ -0,0 +1,45 @@
+"""
+Tests for monster inserts into BigQuery
+"""
+
+import asyncio
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add sql_schema to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'sql_schema'))
+
+import monsters_schema
+
+
+def _monsters(count):
+    return [{"name": f"Goblin {i}", "hit_points": 7, "challenge_rating": "1/4"} for i in range(count)]
+
+
+def test_bulk_async_insert_uses_one_load_job():
+    """Inserts of LOAD_JOB_MIN_ROWS or more become a single load job, not per-chunk streams."""
+    with patch.object(monsters_schema, "load_monster_rows") as load, \
+            patch.object(monsters_schema, "_get_write_client") as write_client:
+        asyncio.run(monsters_schema.insert_monster_data_async(
+            "test-project", _monsters(monsters_schema.LOAD_JOB_MIN_ROWS)
+        ))
+
+    load.assert_called_once()
+    assert len(load.call_args.args[1]) == monsters_schema.LOAD_JOB_MIN_ROWS
+    write_client.assert_not_called()
+
+
+def test_small_async_insert_shares_one_stream():
+    """Smaller inserts send every append request on a single Storage Write stream."""
+    stream = Mock()
+    with patch.object(monsters_schema, "USE_STORAGE_API", True), \
+            patch.object(monsters_schema, "_get_write_client"), \
+            patch.object(monsters_schema.writer, "AppendRowsStream", return_value=stream) as open_stream:
+        asyncio.run(monsters_schema.insert_monster_data_async(
+            "test-project", _monsters(250), batch_size=100, max_concurrency=2
+        ))
+
+    open_stream.assert_called_once()
+    assert stream.send.call_count == 3
+    stream.close.assert_called_once()
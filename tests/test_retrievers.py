@@ -0,0 +1,115 @@
+"""
+Tests for the retriever caches
+"""
+
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+import sys
+import os
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from rag_engine import retrievers
+
+SQL = "SELECT armor_class FROM `p.d.monsters` WHERE name = 'Goblin' LIMIT 1"
+
+
+def _structured(sql_results):
+    """Build a StructuredRetriever with mocked SQL generation and execution."""
+    retriever = retrievers.StructuredRetriever.__new__(retrievers.StructuredRetriever)
+    retriever._sql_cache = OrderedDict()
+    retriever._result_cache = OrderedDict()
+    retriever._failure_cache = OrderedDict()
+    retriever._sql_pool = ThreadPoolExecutor(max_workers=1)
+    retriever._generate_sql = AsyncMock(return_value=SQL)
+    retriever.sql_tool = SimpleNamespace(run=Mock(side_effect=sql_results))
+    return retriever
+
+
+async def _retrieve_twice(retriever, first, second, **kwargs):
+    return await retriever.retrieve(first, **kwargs), await retriever.retrieve(second, **kwargs)
+
+
+def test_repeated_question_skips_generation_and_query():
+    """A repeated question (after normalization) reuses its SQL and query result."""
+    retriever = _structured(["[(15,)]"])
+
+    first, second = asyncio.run(_retrieve_twice(retriever, "Goblin AC?", "  goblin   ac? "))
+
+    assert first["result"] == second["result"] == "[(15,)]"
+    assert retriever._generate_sql.await_count == 1
+    assert retriever.sql_tool.run.call_count == 1
+
+
+def test_query_error_is_not_cached():
+    """SQL whose query returned an error is cached neither as a result nor for the question."""
+    bad_sql = "SELECT ac FROM `p.d.monsters` LIMIT 1"
+    retriever = _structured(lambda sql: "Error: unrecognized name: ac" if sql == bad_sql else "[(15,)]")
+    retriever._generate_sql = AsyncMock(side_effect=[bad_sql, SQL])
+
+    result = asyncio.run(retriever.retrieve("Goblin AC?"))
+
+    assert result["success"] is True
+    assert result["attempt"] == 2
+    assert bad_sql not in retriever._result_cache
+    assert retriever._sql_cache["goblin ac?"][1] == SQL
+
+
+def test_failed_question_is_short_circuited_until_expiry():
+    """A question that exhausted its retries fails fast from the cache until the TTL passes."""
+    retriever = _structured(["Error: syntax error", "Error: syntax error", "[(15,)]"])
+    now = 1000.0
+
+    with patch.object(retrievers.time, "monotonic", side_effect=lambda: now):
+        failed = asyncio.run(retriever.retrieve("Goblin AC?", max_retries=1))
+        cached = asyncio.run(retriever.retrieve("Goblin AC?", max_retries=1))
+        assert retriever.sql_tool.run.call_count == 2
+
+        now += retrievers.SQL_FAILURE_CACHE_TTL_SECONDS
+        retried = asyncio.run(retriever.retrieve("Goblin AC?", max_retries=1))
+
+    assert failed["success"] is False and "cached" not in failed
+    assert cached["success"] is False and cached["cached"] is True
+    assert cached["error"] == failed["error"]
+    assert retried["success"] is True
+    assert retriever.sql_tool.run.call_count == 3
+
+
+def _bucket(generation):
+    """Fake GCS bucket whose blob writes its generation as the file content."""
+    def download_to_filename(path, if_generation_match=None):
+        with open(path, "w") as f:
+            f.write(f"generation {blob.generation}")
+
+    blob = SimpleNamespace(generation=generation, download_to_filename=Mock(side_effect=download_to_filename))
+    return SimpleNamespace(name="test-bucket", get_blob=Mock(return_value=blob)), blob
+
+
+def test_sync_blob_downloads_only_new_generations(tmp_path):
+    """The local copy is reused until the blob is republished."""
+    local_path = tmp_path / "index.faiss"
+    bucket, blob = _bucket(1)
+
+    retrievers._sync_blob(bucket, "vector_store/index.faiss", local_path)
+    retrievers._sync_blob(bucket, "vector_store/index.faiss", local_path)
+    assert blob.download_to_filename.call_count == 1
+
+    blob.generation = 2
+    retrievers._sync_blob(bucket, "vector_store/index.faiss", local_path)
+    assert blob.download_to_filename.call_count == 2
+    assert local_path.read_text() == "generation 2"
+
+
+def test_sync_blob_keeps_local_copy_when_bucket_unreachable(tmp_path):
+    """An existing local copy is used if the bucket cannot be checked."""
+    local_path = tmp_path / "index.faiss"
+    local_path.write_text("cached")
+    bucket = SimpleNamespace(name="test-bucket", get_blob=Mock(side_effect=OSError("offline")))
+
+    retrievers._sync_blob(bucket, "vector_store/index.faiss", local_path)
+
+    assert local_path.read_text() == "cached"
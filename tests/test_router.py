@@ -0,0 +1,62 @@
+"""
+Tests for batched query routing
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+import sys
+import os
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from rag_engine.router import QueryRouter
+
+
+QUESTIONS = [
+    "What is a Lich's armor class?",
+    "Can you describe a haunted forest?",
+    "How many hit points does a goblin have?",
+]
+
+
+def _router(reply, cache_path=None):
+    """Build a router without a semantic cache, with a mocked batch model."""
+    router = QueryRouter("test-key", cache_path=cache_path)
+    router._embedder_unavailable = True
+    router.batch_llm = SimpleNamespace(ainvoke=AsyncMock(return_value=SimpleNamespace(content=reply)))
+    return router
+
+
+def test_route_queries_matches_answers_by_number():
+    """Numbered answers are matched to their questions regardless of order."""
+    router = _router("3. structured\n1. structured\n2. unstructured")
+
+    routes = asyncio.run(router.route_queries(QUESTIONS))
+
+    assert routes == ["structured", "unstructured", "structured"]
+
+
+def test_route_queries_does_not_shift_on_missing_answer():
+    """A dropped answer leaves its question unclassified and uncached, without shifting the rest."""
+    router = _router("2. unstructured\n3. structured")
+
+    routes = asyncio.run(router.route_queries(QUESTIONS))
+
+    assert routes == ["unstructured", "unstructured", "structured"]
+    assert "what is a lich's armor class?" not in router._route_cache
+    assert router._route_cache["can you describe a haunted forest?"] == "unstructured"
+
+
+def test_batch_routes_persist_across_routers(tmp_path):
+    """Batch decisions are written to the on-disk cache and read back by a new router."""
+    cache_path = str(tmp_path / "route_cache.db")
+    router = _router("1. structured\n2. unstructured\n3. structured", cache_path)
+    asyncio.run(router.route_queries(QUESTIONS))
+
+    restarted = _router("", cache_path)
+    routes = asyncio.run(restarted.route_queries(QUESTIONS))
+
+    assert routes == ["structured", "unstructured", "structured"]
+    restarted.batch_llm.ainvoke.assert_not_called()